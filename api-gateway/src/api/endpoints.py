@@ -6,12 +6,12 @@ Contains all API endpoints for the gateway service.
 import logging
 from typing import Dict, List
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from src.api.models import APIResponse, RunnerRequest
 from src.config.settings import ORCHESTRATOR_URL, DEFAULT_HEADERS
-from src.utils.helpers import format_log
+from src.utils.helpers import api_response, format_log
 from src.services.request_router import RequestRouter
 from version import __version__
 
@@ -21,18 +21,46 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 request_router = RequestRouter(ORCHESTRATOR_URL, 30.0, DEFAULT_HEADERS)
 
-
-@router.post("/runners", response_model=APIResponse)
-async def create_runners(request: RunnerRequest):
+# Validador de RunnerRequest construido una vez: valida el body JSON directo en pydantic-core
+_RUNNER_REQUEST_ADAPTER = TypeAdapter(RunnerRequest)
+# El body se lee manualmente, así que su schema se declara explícitamente para OpenAPI
+_RUNNER_REQUEST_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": RunnerRequest.model_json_schema()}},
+    }
+}
+
+
+def _validation_message(error: ValidationError) -> str:
+    """Primer error de validación del body, con el mensaje en español."""
+    errors = error.errors()
+    if not errors:
+        return "Datos inválidos"
+    first = errors[0]
+    if first["type"] == "missing":
+        return f"Campo obligatorio faltante: {'.'.join(map(str, first['loc']))}"
+    return first["msg"].removeprefix("Value error, ")
+
+
+@router.post(
+    "/runners",
+    response_model=None,
+    responses={200: {"model": APIResponse}},
+    openapi_extra=_RUNNER_REQUEST_OPENAPI,
+)
+async def create_runners(request: Request):
     """Create new ephemeral runners."""
     try:
-        # Validate request
-        request_router.validate_runner_request(request.dict())
+        runner_request = _RUNNER_REQUEST_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        # Solo este endpoint responde 400 ante un body inválido (contrato documentado)
+        raise HTTPException(status_code=400, detail=_validation_message(e))
 
-        # Create runners
-        runners = await request_router.create_runners(request.dict())
+    try:
+        runners = await request_router.create_runner(runner_request.model_dump())
 
-        return APIResponse(data=runners, message=f"Creados {len(runners)} runners exitosamente")
+        return api_response(runners, f"Creados {len(runners)} runners exitosamente")
 
     except HTTPException:
         raise
@@ -41,13 +69,13 @@ async def create_runners(request: RunnerRequest):
         raise HTTPException(status_code=500, detail="Error interno del servidor")
 
 
-@router.get("/runners/{runner_id}", response_model=APIResponse)
+@router.get("/runners/{runner_id}", response_model=None, responses={200: {"model": APIResponse}})
 async def get_runner_status(runner_id: str):
     """Get status of a specific runner."""
     try:
         status = await request_router.get_runner_status(runner_id)
 
-        return APIResponse(data=status, message="Estado obtenido exitosamente")
+        return api_response(status, "Estado obtenido exitosamente")
 
     except HTTPException:
         raise
@@ -56,13 +84,13 @@ async def get_runner_status(runner_id: str):
         raise HTTPException(status_code=500, detail="Error interno del servidor")
 
 
-@router.delete("/runners/{runner_id}", response_model=APIResponse)
+@router.delete("/runners/{runner_id}", response_model=None, responses={200: {"model": APIResponse}})
 async def destroy_runner(runner_id: str):
     """Destroy a specific runner."""
     try:
         result = await request_router.destroy_runner(runner_id)
 
-        return APIResponse(data=result, message=f"Runner {runner_id} destruido exitosamente")
+        return api_response(result, f"Runner {runner_id} destruido exitosamente")
 
     except HTTPException:
         raise
@@ -71,13 +99,13 @@ async def destroy_runner(runner_id: str):
         raise HTTPException(status_code=500, detail="Error interno del servidor")
 
 
-@router.get("/runners", response_model=APIResponse)
+@router.get("/runners", response_model=None, responses={200: {"model": APIResponse}})
 async def list_runners():
     """List all active runners."""
     try:
         runners = await request_router.list_runners()
 
-        return APIResponse(data=runners, message=f"Listados {len(runners)} runners activos")
+        return api_response(runners, f"Listados {len(runners)} runners activos")
 
     except HTTPException:
         raise
@@ -86,13 +114,13 @@ async def list_runners():
         raise HTTPException(status_code=500, detail="Error interno del servidor")
 
 
-@router.post("/runners/cleanup", response_model=APIResponse)
+@router.post("/runners/cleanup", response_model=None, responses={200: {"model": APIResponse}})
 async def cleanup_runners():
     """Clean up inactive runners."""
     try:
         result = await request_router.cleanup_runners()
 
-        return APIResponse(data=result, message="Limpieza completada exitosamente")
+        return api_response(result, "Limpieza completada exitosamente")
 
     except HTTPException:
         raise
@@ -101,32 +129,28 @@ async def cleanup_runners():
         raise HTTPException(status_code=500, detail="Error interno del servidor")
 
 
-@router.get("/health", response_model=APIResponse)
-async def full_health_check():
+@router.get("/health", response_model=None, responses={200: {"model": APIResponse}})
+async def full_health_check(request: Request):
     """Full health check including orchestrator."""
-    try:
-        # Check orchestrator
-        orchestrator_health = await request_router.get_health()
-        
-        return APIResponse(
-            data={
+    # Snapshot mantenido por la tarea de refresco del gateway (None = no alcanzable)
+    orchestrator_status = request.app.state.orchestrator_status
+    if orchestrator_status is not None:
+        return api_response(
+            {
                 "status": "healthy",
                 "service": "api-gateway",
                 "version": __version__,
-                "orchestrator": orchestrator_health.get("status", "unknown")
+                "orchestrator": orchestrator_status
             },
-            message="Gateway y orchestrator funcionando correctamente",
+            "Gateway y orchestrator funcionando correctamente",
         )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(format_log('ERROR', 'Error en health check completo', str(e)))
-        return APIResponse(
-            data={
+    else:
+        return api_response(
+            {
                 "status": "degraded",
                 "service": "api-gateway",
                 "version": __version__,
                 "orchestrator": "unreachable"
             },
-            message="Gateway con problemas en orchestrator",
+            "Gateway con problemas en orchestrator",
         )
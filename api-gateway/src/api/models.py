@@ -3,10 +3,14 @@ API Gateway - Pydantic Models for Request/Response Validation
 Contains all data models used by the API Gateway for request validation and response formatting.
 """
 
-from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from src.utils.helpers import utc_now_iso
+
+# Scopes aceptados por RunnerRequest
+_VALID_SCOPES = frozenset(("repo", "org"))
 
 
 class RunnerRequest(BaseModel):
@@ -16,7 +20,38 @@ class RunnerRequest(BaseModel):
     runner_name: Optional[str] = Field(None, description="Nombre único del runner")
     runner_group: Optional[str] = Field(None, description="Grupo del runner")
     labels: Optional[List[str]] = Field(None, description="Labels para el runner")
-    count: int = Field(1, ge=1, le=10, description="Número de runners a crear")
+    # Rango validado abajo para conservar el mensaje en español; el schema lo sigue declarando
+    count: int = Field(
+        1, description="Número de runners a crear", json_schema_extra={"minimum": 1, "maximum": 10}
+    )
+
+    @field_validator("scope", mode="after")
+    @classmethod
+    def _validate_scope(cls, value: str) -> str:
+        if value not in _VALID_SCOPES:
+            raise ValueError("Scope debe ser 'repo' u 'org'")
+        return value
+
+    @field_validator("count", mode="after")
+    @classmethod
+    def _validate_count(cls, value: int) -> int:
+        if not 1 <= value <= 10:
+            raise ValueError("Count debe ser un entero entre 1 y 10")
+        return value
+
+    @field_validator("labels", mode="after")
+    @classmethod
+    def _validate_labels(cls, value: Optional[List[str]]) -> Optional[List[str]]:
+        if value is not None and not all(label.strip() for label in value):
+            raise ValueError("Cada label debe ser una cadena no vacía")
+        return value
+
+    @model_validator(mode="after")
+    def _validate_repo_format(self) -> "RunnerRequest":
+        # Mismo criterio que la validación original: basta con que contenga "/"
+        if self.scope == "repo" and "/" not in self.scope_name:
+            raise ValueError("Para scope='repo', scope_name debe tener formato owner/repo")
+        return self
 
 
 class RunnerResponse(BaseModel):
@@ -41,7 +76,7 @@ class APIResponse(BaseModel):
     status: str = "success"
     data: Optional[Any] = None
     message: str = ""
-    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    timestamp: str = Field(default_factory=utc_now_iso)
 
 
 class ErrorResponse(APIResponse):
@@ -11,7 +11,9 @@ from version import __version__
 API_GATEWAY_PORT: int = int(os.getenv("API_GATEWAY_PORT", "8080"))
 ORCHESTRATOR_PORT: str = os.getenv("ORCHESTRATOR_PORT", "8000")
 ORCHESTRATOR_URL: str = f"http://orchestrator:{ORCHESTRATOR_PORT}"
-CORS_ORIGINS: str = os.getenv("CORS_ORIGINS", "*")
+CORS_ORIGINS: list[str] = [
+    origin.strip() for origin in os.getenv("CORS_ORIGINS", "*").split(",") if origin.strip()
+]
 
 # Service Configuration
 USER_AGENT: str = f"GHA-API-Gateway/{__version__}"
@@ -25,11 +27,19 @@ APP_DESCRIPTION: str = "Gateway para la plataforma de runners efímeros de GitHu
 APP_VERSION: str = __version__
 API_PREFIX: str = "/api/v1"
 
+# Response Cache Configuration (GETs idempotentes servidos desde memoria)
+RESPONSE_CACHE_PATHS: tuple[str, ...] = ("/health", f"{API_PREFIX}/health")
+RESPONSE_CACHE_TTL: float = 2.0
+
 # Health Check Configuration
 HEALTH_CHECK_INTERVAL: str = "30s"
 HEALTH_CHECK_TIMEOUT: str = "10s"
 HEALTH_CHECK_START_PERIOD: str = "5s"
 HEALTH_CHECK_RETRIES: int = 3
+# Intervalo (segundos) de refresco en segundo plano del estado del orchestrator
+HEALTH_REFRESH_INTERVAL: float = float(os.getenv("HEALTH_REFRESH_INTERVAL", "10"))
+# Tiempo máximo (segundos) de cada verificación de salud del orchestrator
+HEALTH_PROBE_TIMEOUT: float = 2.0
 
 # Docker Configuration
 DOCKER_EXPOSED_PORT: int = 8080
@@ -46,6 +56,7 @@ DEFAULT_HEADERS = {
 }
 
 # CORS Configuration
-CORS_ALLOW_CREDENTIALS: bool = True
+# Credenciales con origen comodín no es válido según la especificación CORS
+CORS_ALLOW_CREDENTIALS: bool = "*" not in CORS_ORIGINS
 CORS_ALLOW_METHODS: list[str] = ["GET", "POST", "PUT", "DELETE"]
 CORS_ALLOW_HEADERS: list[str] = ["*"]
@@ -3,29 +3,62 @@ API Gateway - Core Service Configuration
 Contains FastAPI app configuration, middleware setup, and service initialization.
 """
 
+import asyncio
 import logging
 import os
+import time
 from contextlib import asynccontextmanager
-from datetime import datetime
 from typing import Any, Dict
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-from src.api.endpoints import router
+from src.api.endpoints import request_router, router
+from src.api.models import APIResponse
 from src.config.settings import (
     APP_TITLE, APP_DESCRIPTION, APP_VERSION, API_PREFIX,
     CORS_ORIGINS, CORS_ALLOW_CREDENTIALS, CORS_ALLOW_METHODS, CORS_ALLOW_HEADERS,
-    ORCHESTRATOR_URL, LOG_LEVEL
+    ORCHESTRATOR_URL, LOG_LEVEL, HEALTH_REFRESH_INTERVAL, HEALTH_PROBE_TIMEOUT,
+    RESPONSE_CACHE_PATHS, RESPONSE_CACHE_TTL
 )
 from src.middleware.error_handlers import setup_exception_handlers
-from src.utils.helpers import setup_logging_config, log_request_info, format_log
+from src.middleware.response_cache import ResponseCacheMiddleware
+from src.utils.helpers import setup_logging_config, log_request_info, format_log, run_cached_clock, utc_now_iso, api_response
 from version import __version__
 
 # Configure logging
 setup_logging_config()
 logger = logging.getLogger(__name__)
 
+# Health checks internos que no se loggean
+_HEALTH_CHECK_PATHS = frozenset(("/health", "/healthz"))
+_LOCAL_CLIENTS = frozenset(("127.0.0.1", "testclient", "localhost"))
+
+# Respuesta de /healthz serializada una vez, partida en el marcador del timestamp
+_HEALTHZ_BODY_PREFIX, _HEALTHZ_BODY_SUFFIX = APIResponse(
+    data={"status": "healthy", "service": "api-gateway", "version": __version__},
+    message="Gateway saludable",
+    timestamp="__timestamp__",
+).model_dump_json().encode().split(b"__timestamp__")
+
+
+async def refresh_orchestrator_health(app: FastAPI) -> None:
+    """Actualiza periódicamente el snapshot de salud del orchestrator."""
+    while True:
+        try:
+            # Un orchestrator lento no debe retener el snapshot más allá del timeout
+            orchestrator_health = await asyncio.wait_for(
+                request_router.get_health(), timeout=HEALTH_PROBE_TIMEOUT
+            )
+            app.state.orchestrator_status = orchestrator_health.get("status", "unknown")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(format_log('ERROR', 'Error verificando salud del orchestrator', str(e)))
+            app.state.orchestrator_status = None
+        await asyncio.sleep(HEALTH_REFRESH_INTERVAL)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -33,9 +66,22 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(format_log('START', 'API Gateway Service'))
     logger.info(format_log('CONFIG', 'Orquestador configurado', ORCHESTRATOR_URL))
+    
+    # Cliente HTTP propio de este ciclo de vida (se cierra en el shutdown)
+    request_router.open()
+    
+    # None = orchestrator no alcanzable (o aún no verificado)
+    app.state.orchestrator_status = None
+    health_task = asyncio.create_task(refresh_orchestrator_health(app))
+    clock_task = asyncio.create_task(run_cached_clock())
     yield
     # Shutdown
     logger.info(format_log('INFO', 'Deteniendo API Gateway Service'))
+    health_task.cancel()
+    clock_task.cancel()
+    # Esperar la cancelación antes de cerrar el cliente que usa health_task
+    await asyncio.gather(health_task, clock_task, return_exceptions=True)
+    await request_router.close()
 
 
 def create_app() -> FastAPI:
@@ -47,9 +93,19 @@ def create_app() -> FastAPI:
         docs_url="/docs",
         redoc_url="/redoc",
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+    )
+
+    # Add response cache middleware (idempotent GETs, short TTL).
+    # Se registra antes que CORS: add_middleware antepone, así CORS queda por fuera
+    # y procesa también las respuestas servidas desde la caché (que no dependen de Origin)
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        cached_paths=RESPONSE_CACHE_PATHS,
+        ttl=RESPONSE_CACHE_TTL,
     )
 
-    # Add CORS middleware
+    # Add CORS middleware (Starlette ya omite el procesamiento sin header Origin)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=CORS_ORIGINS,
@@ -62,21 +118,20 @@ def create_app() -> FastAPI:
     @app.middleware("http")
     async def logging_middleware(request: Request, call_next):
         """Middleware para logging de solicitudes externas."""
-        start_time = datetime.utcnow()
-
-        # Get client information
-        client_info = log_request_info(request)
+        start_time = time.perf_counter()
 
         # No loggear health checks internos (solo para verbose/debug)
         # Detectar health checks por path y IP local
+        client_ip = request.client.host if request.client else "unknown"
         is_health_check = (
-            request.url.path in ["/health", "/healthz"] and 
-            client_info['ip'] in ["127.0.0.1", "testclient", "localhost"]
+            request.scope["path"] in _HEALTH_CHECK_PATHS and
+            client_ip in _LOCAL_CLIENTS
         )
 
-        # Log request solo si no es health check interno
-        if not is_health_check:
-            logger.info(
+        # Log request (DEBUG) solo si no es health check interno
+        if not is_health_check and logger.isEnabledFor(logging.DEBUG):
+            client_info = log_request_info(request)
+            logger.debug(
                 format_log('REQUEST', 'Solicitud recibida', f"{client_info['method']} {client_info['url']} - IP: {client_info['ip']}")
             )
 
@@ -84,7 +139,7 @@ def create_app() -> FastAPI:
         response = await call_next(request)
 
         # Calculate duration
-        process_time = (datetime.utcnow() - start_time).total_seconds()
+        process_time = time.perf_counter() - start_time
 
         # Log response solo si no es health check interno
         if not is_health_check:
@@ -99,51 +154,39 @@ def create_app() -> FastAPI:
     app.include_router(router, prefix=API_PREFIX)
     
     # Add health check endpoints at root level (for Docker health checks)
-    @app.get("/health", tags=["Health"])
-    async def root_health_check():
+    @app.get("/health", tags=["Health"], response_model=None, responses={200: {"model": APIResponse}})
+    async def root_health_check(request: Request):
         """Basic health check endpoint at root level."""
-        try:
-            from src.services.request_router import RequestRouter
-            from src.config.settings import ORCHESTRATOR_URL, DEFAULT_HEADERS
-            from src.api.models import APIResponse
-            
-            request_router = RequestRouter(ORCHESTRATOR_URL, 30.0, DEFAULT_HEADERS)
-            orchestrator_health = await request_router.get_health()
-            
-            return APIResponse(
-                data={
+        # Estado del orchestrator tomado del snapshot refrescado en segundo plano
+        orchestrator_status = request.app.state.orchestrator_status
+        if orchestrator_status is not None:
+            return api_response(
+                {
                     "status": "healthy",
                     "service": "api-gateway",
                     "version": __version__,
-                    "orchestrator": orchestrator_health.get("status", "unknown")
+                    "orchestrator": orchestrator_status
                 },
-                message="Gateway funcionando correctamente",
+                "Gateway funcionando correctamente",
             )
-        except Exception as e:
-            logger.error(format_log('ERROR', 'Error verificando salud del orchestrator', str(e)))
-            from src.api.models import APIResponse
-            return APIResponse(
-                data={
+        else:
+            return api_response(
+                {
                     "status": "degraded",
                     "service": "api-gateway",
                     "version": __version__,
                     "orchestrator": "unreachable"
                 },
-                message="Gateway funcionando pero con problemas en orchestrator",
+                "Gateway funcionando pero con problemas en orchestrator",
             )
 
-    @app.get("/healthz", tags=["Health"])
+    @app.get("/healthz", tags=["Health"], response_model=None, responses={200: {"model": APIResponse}})
     async def root_docker_health_check():
         """Docker health check endpoint at root level."""
-        try:
-            from src.api.models import APIResponse
-            return APIResponse(
-                data={"status": "healthy", "service": "api-gateway", "version": __version__},
-                message="Gateway saludable",
-            )
-        except Exception as e:
-            logger.error(f"Health check falló: {e}")
-            from fastapi import HTTPException
-            raise HTTPException(status_code=503, detail="Servicio no saludable")
+        # Cuerpo constante pre-serializado; solo se inserta el timestamp cacheado
+        return Response(
+            content=_HEALTHZ_BODY_PREFIX + utc_now_iso().encode() + _HEALTHZ_BODY_SUFFIX,
+            media_type="application/json",
+        )
 
     return app
@@ -7,7 +7,7 @@ import logging
 from typing import Any, Dict
 
 from fastapi import HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from src.api.models import ErrorResponse
 
@@ -18,16 +18,16 @@ def create_error_response(
     status_code: int, 
     message: str, 
     error_data: Dict[str, Any] = None
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Create a standardized error response."""
     error_response = ErrorResponse(
         message=message,
         data=error_data or {"error_code": status_code}
     )
-    return JSONResponse(status_code=status_code, content=error_response.dict())
+    return ORJSONResponse(status_code=status_code, content=error_response.dict())
 
 
-def handle_http_exception(request: Request, exc: HTTPException) -> JSONResponse:
+def handle_http_exception(request: Request, exc: HTTPException) -> ORJSONResponse:
     """Handle HTTP exceptions with standardized format."""
     return create_error_response(
         status_code=exc.status_code,
@@ -36,7 +36,7 @@ def handle_http_exception(request: Request, exc: HTTPException) -> JSONResponse:
     )
 
 
-def handle_general_exception(request: Request, exc: Exception) -> JSONResponse:
+def handle_general_exception(request: Request, exc: Exception) -> ORJSONResponse:
     """Handle general exceptions with standardized format."""
     logger.error(f"Excepción no manejada: {exc}")
     
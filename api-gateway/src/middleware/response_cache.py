@@ -0,0 +1,69 @@
+"""
+API Gateway - Response Cache Middleware
+Caches idempotent GET responses in-process for a short TTL.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Iterable
+
+
+def _copy_message(message: dict) -> dict:
+    """Copia un mensaje ASGI con su propia lista de headers.
+
+    Las capas externas (p.ej. CORS) modifican los headers en sitio; sin la copia,
+    los headers añadidos para una request quedarían guardados en la caché.
+    """
+    if "headers" not in message:
+        return dict(message)
+    return {**message, "headers": list(message["headers"])}
+
+
+class ResponseCacheMiddleware:
+    """ASGI middleware that serves repeated GETs on selected paths from a TTL cache."""
+
+    def __init__(self, app, cached_paths: Iterable[str], ttl: float = 2.0, max_entries: int = 256):
+        self.app = app
+        self.cached_paths = frozenset(cached_paths)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (expires_at, mensajes ASGI de la respuesta)
+        self._cache: OrderedDict = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] not in self.cached_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        # El cliente pide explícitamente una respuesta fresca
+        if b"no-cache" in headers.get(b"cache-control", b""):
+            await self.app(scope, receive, send)
+            return
+
+        key = (scope["path"], scope["query_string"], headers.get(b"accept", b""))
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > now:
+            self._cache.move_to_end(key)
+            for message in entry[1]:
+                await send(_copy_message(message))
+            return
+
+        messages = []
+
+        async def send_and_record(message):
+            messages.append(_copy_message(message))
+            await send(message)
+
+        await self.app(scope, receive, send_and_record)
+
+        if messages and messages[0].get("status") == 200:
+            self._cache[key] = (now + self.ttl, messages)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
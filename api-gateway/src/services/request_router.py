@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import httpx
 from fastapi import HTTPException
@@ -22,6 +22,25 @@ class RequestRouter:
             "Content-Type": "application/json", 
             "User-Agent": f"GHA-API-Gateway/{__version__}"
         }
+        # Cliente compartido (keep-alive al orchestrator): se abre en el startup del lifespan
+        # y se cierra en el shutdown, así cada ciclo de vida de la app usa uno propio
+        self.client: Optional[httpx.AsyncClient] = None
+
+    def open(self) -> None:
+        """Crea el cliente HTTP compartido para el ciclo de vida actual de la app."""
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(
+                base_url=self.orchestrator_url,
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            )
+
+    async def close(self) -> None:
+        """Cierra el cliente HTTP compartido."""
+        client, self.client = self.client, None
+        if client is not None:
+            await client.aclose()
 
     async def forward_request_with_retry(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
         """
@@ -62,26 +81,28 @@ class RequestRouter:
         Raises:
             HTTPException: Si hay error en la solicitud
         """
-        url = f"{self.orchestrator_url}{path}"
-
+        client = self.client
+        if client is None:
+            raise HTTPException(status_code=503, detail="Gateway no inicializado")
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.request(method, url, headers=self.headers, **kwargs)
+            response = await client.request(method, path, **kwargs)
 
-                logger.info(format_log('INFO', 'Solicitud al orquestador', f"{method} {url} - Status: {response.status_code}"))
+            logger.info(format_log('INFO', 'Solicitud al orquestador', f"{method} {self.orchestrator_url}{path} - Status: {response.status_code}"))
 
-                if response.status_code >= 400:
-                    error_detail = "Error del servidor"
-                    try:
-                        error_data = response.json()
-                        error_detail = error_data.get("detail", error_detail)
-                    except (ValueError, KeyError):
-                        pass
+            if response.status_code >= 400:
+                error_detail = "Error del servidor"
+                try:
+                    error_data = response.json()
+                    error_detail = error_data.get("detail", error_detail)
+                except (ValueError, KeyError):
+                    pass
 
-                    raise HTTPException(status_code=response.status_code, detail=error_detail)
+                raise HTTPException(status_code=response.status_code, detail=error_detail)
 
-                return response.json()
+            return response.json()
 
+        except HTTPException:
+            raise
         except httpx.TimeoutException:
             logger.error("Timeout del orquestador")
             raise HTTPException(status_code=504, detail="Timeout del orquestador")
@@ -92,84 +113,8 @@ class RequestRouter:
             logger.error(f"Error interno del gateway: {e}")
             raise HTTPException(status_code=500, detail="Error interno del gateway")
 
-    def validate_required_fields(self, request_data: Dict[str, Any]) -> None:
-        """Valida campos obligatorios."""
-        required_fields = ["scope", "scope_name"]
-
-        for field in required_fields:
-            if field not in request_data:
-                raise HTTPException(status_code=400, detail=f"Campo obligatorio faltante: {field}")
-
-    def validate_scope(self, scope: str) -> None:
-        """Valida el scope."""
-        if scope not in ["repo", "org"]:
-            raise HTTPException(status_code=400, detail="Scope debe ser 'repo' u 'org'")
-
-    def validate_repo_format(self, scope_name: str) -> None:
-        """Valida formato de repositorio para scope 'repo'."""
-        if "/" not in scope_name:
-            raise HTTPException(
-                status_code=400,
-                detail="Para scope='repo', scope_name debe tener formato owner/repo",
-            )
-
-    def validate_count(self, count: Any) -> None:
-        """Valida el campo count."""
-        if not isinstance(count, int) or count < 1 or count > 10:
-            raise HTTPException(status_code=400, detail="Count debe ser un entero entre 1 y 10")
-
-    def validate_labels(self, labels: Any) -> None:
-        """Valida el campo labels."""
-        if labels is None:
-            return
-
-        if not isinstance(labels, list):
-            raise HTTPException(status_code=400, detail="Labels debe ser una lista")
-
-        for label in labels:
-            if not isinstance(label, str) or len(label.strip()) == 0:
-                raise HTTPException(
-                    status_code=400, detail="Cada label debe ser una cadena no vacía"
-                )
-
-    def validate_runner_request(self, request_data: Dict[str, Any]) -> bool:
-        """
-        Valida los datos de una solicitud de creación de runner.
-
-        Args:
-            request_data: Datos a validar
-
-        Returns:
-            True si los datos son válidos
-
-        Raises:
-            HTTPException: Si los datos son inválidos
-        """
-        # Validar campos obligatorios
-        self.validate_required_fields(request_data)
-
-        # Validar scope
-        scope = request_data.get("scope")
-        self.validate_scope(scope)
-
-        # Validar scope_name para repo
-        if scope == "repo":
-            scope_name = request_data.get("scope_name", "")
-            self.validate_repo_format(scope_name)
-
-        # Validar count
-        count = request_data.get("count", 1)
-        self.validate_count(count)
-
-        # Validar labels
-        labels = request_data.get("labels")
-        self.validate_labels(labels)
-
-        return True
-
     async def create_runner(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Crea un runner a través del orchestrator con reintentos."""
-        self.validate_runner_request(request_data)
+        """Crea runners a través del orchestrator con reintentos (datos ya validados por RunnerRequest)."""
         return await self.forward_request_with_retry("POST", "/runners/create", json=request_data)
 
     async def get_runner_status(self, runner_id: str) -> Dict[str, Any]:
@@ -3,15 +3,23 @@ API Gateway - Utility Functions
 Contains shared utility functions for logging and common operations.
 """
 
+import asyncio
+import atexit
 import logging
+import queue
+from datetime import datetime, timezone
+from functools import partial
+from logging.handlers import QueueHandler, QueueListener
+from types import MappingProxyType
 from typing import Any, Dict, Optional
 
 from fastapi import Request
+from fastapi.responses import ORJSONResponse
 
 from src.config.settings import LOG_LEVEL
 
 # Constantes de formato para logging estandarizado (mismo sistema que orchestrator)
-LOG_CATEGORIES = {
+LOG_CATEGORIES = MappingProxyType({
     'START': '🚀 INICIO',
     'CONFIG': '⚙️ CONFIG', 
     'MONITOR': '🔄 MONITOREO',
@@ -23,21 +31,32 @@ LOG_CATEGORIES = {
     'RESPONSE': '📤 RESPONSE',
     'HEALTH': '💚 HEALTH',
     'SHUTDOWN': '🛑 SHUTDOWN'
-}
+})
+
+# Prefijos precalculados (con espacio final) por categoría
+_LOG_PREFIX = {k: f"{v} " for k, v in LOG_CATEGORIES.items()}
+_DEFAULT_PREFIX = "📋 INFO "
 
 def format_log(category: str, action: str, detail: str = "") -> str:
     """Formatea mensaje de log consistente (mismo sistema que orchestrator)."""
-    prefix = LOG_CATEGORIES.get(category, '📋 INFO')
+    prefix = _LOG_PREFIX.get(category, _DEFAULT_PREFIX)
     if detail:
-        return f"{prefix} {action}: {detail}"
-    return f"{prefix} {action}"
+        return f"{prefix}{action}: {detail}"
+    return f"{prefix}{action}"
 
 def setup_logging_config() -> None:
     """Configure basic logging for the application."""
-    logging.basicConfig(
-        level=LOG_LEVEL,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    # El request path solo encola; un hilo dedicado formatea y escribe
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     )
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    logging.basicConfig(level=LOG_LEVEL, handlers=[QueueHandler(log_queue)])
     
     # Log de configuración
     logger = logging.getLogger(__name__)
@@ -50,3 +69,36 @@ def log_request_info(request: Request) -> Dict[str, Any]:
         "url": str(request.url),
         "ip": request.client.host if request.client else "unknown",
     }
+
+
+# Reloj cacheado: timestamp ISO actualizado en segundo plano cada 100 ms
+_CLOCK_RESOLUTION = 0.1
+_utcnow = partial(datetime.now, timezone.utc)
+
+
+def _format_iso(now: datetime) -> str:
+    """Formatea como ISO 8601 UTC con milisegundos (ej: 2024-02-04T23:54:00.000Z)."""
+    return now.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+_now_iso: str = _format_iso(_utcnow())
+
+
+def utc_now_iso() -> str:
+    """Retorna el timestamp UTC ISO cacheado (resolución de _CLOCK_RESOLUTION)."""
+    return _now_iso
+
+
+async def run_cached_clock() -> None:
+    """Refresca el timestamp cacheado mientras la aplicación esté activa."""
+    global _now_iso
+    while True:
+        _now_iso = _format_iso(_utcnow())
+        await asyncio.sleep(_CLOCK_RESOLUTION)
+
+
+def api_response(data: Any = None, message: str = "") -> ORJSONResponse:
+    """Respuesta estándar con la forma de APIResponse, serializada sin response_model ni jsonable_encoder."""
+    return ORJSONResponse(
+        content={"status": "success", "data": data, "message": message, "timestamp": utc_now_iso()}
+    )
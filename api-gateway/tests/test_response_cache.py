@@ -0,0 +1,106 @@
+"""
+Tests del ResponseCacheMiddleware combinado con el procesamiento CORS.
+La misma ruta se pide con y sin header Origin: la respuesta cacheada no debe
+arrastrar headers CORS de otra request.
+"""
+
+import asyncio
+
+import pytest
+
+from src.middleware.response_cache import ResponseCacheMiddleware
+
+ALLOWED_ORIGIN = "https://dashboard.example"
+
+
+async def _backend(scope, receive, send):
+    """App ASGI mínima que siempre responde 200."""
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json")],
+    })
+    await send({"type": "http.response.body", "body": b'{"status":"ok"}'})
+
+
+def _mutating_cors(app):
+    """Capa externa que, como CORSMiddleware, añade headers en sitio si hay Origin."""
+
+    async def middleware(scope, receive, send):
+        origin = dict(scope["headers"]).get(b"origin")
+        if origin is None:
+            await app(scope, receive, send)
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append((b"access-control-allow-origin", origin))
+            await send(message)
+
+        await app(scope, receive, send_with_cors)
+
+    return middleware
+
+
+def _request(app, origin=None):
+    """Ejecuta un GET /health y retorna los headers de la respuesta."""
+    headers = [(b"accept", b"application/json")]
+    if origin is not None:
+        headers.append((b"origin", origin.encode()))
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/health",
+        "query_string": b"",
+        "headers": headers,
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    assert messages[0]["status"] == 200
+    return dict(messages[0]["headers"])
+
+
+def _cached_app():
+    return ResponseCacheMiddleware(_backend, cached_paths=["/health"], ttl=60.0)
+
+
+def test_cached_response_does_not_keep_cors_headers_from_origin_request():
+    app = _mutating_cors(_cached_app())
+
+    with_origin = _request(app, ALLOWED_ORIGIN)
+    without_origin = _request(app)
+
+    assert with_origin[b"access-control-allow-origin"] == ALLOWED_ORIGIN.encode()
+    assert b"access-control-allow-origin" not in without_origin
+
+
+def test_cached_response_gets_cors_headers_for_origin_request():
+    app = _mutating_cors(_cached_app())
+
+    without_origin = _request(app)
+    with_origin = _request(app, ALLOWED_ORIGIN)
+
+    assert b"access-control-allow-origin" not in without_origin
+    assert with_origin[b"access-control-allow-origin"] == ALLOWED_ORIGIN.encode()
+
+
+def test_starlette_cors_outside_cache_with_and_without_origin():
+    cors = pytest.importorskip("starlette.middleware.cors")
+    app = cors.CORSMiddleware(_cached_app(), allow_origins=[ALLOWED_ORIGIN])
+
+    first = _request(app)
+    with_origin = _request(app, ALLOWED_ORIGIN)
+    other_origin = _request(app, "https://other.example")
+    last = _request(app)
+
+    assert b"access-control-allow-origin" not in first
+    assert with_origin[b"access-control-allow-origin"] == ALLOWED_ORIGIN.encode()
+    assert b"access-control-allow-origin" not in other_origin
+    assert b"access-control-allow-origin" not in last
@@ -3,15 +3,26 @@ API FastAPI del Orchestrator - Punto de entrada y routing.
 Contiene solo la definición de endpoints y delega lógica a src.core.orchestrator.
 """
 
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Annotated
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 
 from src.api.models import *
+from src.api.responses import FastORJSONResponse
 from src.core.orchestrator import OrchestratorService
-from src.utils.helpers import ErrorHandler, format_log, setup_logger, setup_logging_config
+from src.utils.helpers import (
+    ErrorHandler,
+    RunnerNotFoundError,
+    format_log,
+    json_dumps,
+    setup_logger,
+    setup_logging_config,
+)
 from version import __version__
 
 # Configurar logging ANTES de inicializar el servicio
@@ -20,31 +31,55 @@ setup_logging_config()
 # Configuración de logging
 logger = setup_logger(__name__)
 
-# Inicialización del servicio de negocio
-logger.info(format_log('START', 'Orchestrator Service'))
-orchestrator_service = OrchestratorService()
-logger.info(format_log('SUCCESS', 'Servicio inicializado correctamente'))
+# Alias a nivel de módulo: un LOAD_GLOBAL en lugar de global + atributo por request
+_handle_error = ErrorHandler.handle_error
+
+
+@lru_cache(maxsize=8)
+def _not_found_body(detail: str) -> bytes:
+    """Cuerpo 404 serializado una vez por mensaje (IDs obsoletos son frecuentes)."""
+    return json_dumps({"detail": detail})
+
+
+def _not_found_response(error: RunnerNotFoundError) -> Response:
+    """Respuesta 404 pre-serializada, sin pasar por ErrorHandler."""
+    return Response(content=_not_found_body(str(error)), status_code=404, media_type="application/json")
 
 
 # Lifecycle events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Maneja el ciclo de vida de la aplicación FastAPI."""
+    # Inicialización del servicio de negocio (una instancia por worker)
+    logger.info(format_log('START', 'Orchestrator Service'))
+    orchestrator_service = OrchestratorService()
+    app.state.orchestrator_service = orchestrator_service
+    logger.info(format_log('SUCCESS', 'Servicio inicializado correctamente'))
+    
+    # Las consultas de listado leen un snapshot; Docker se consulta a ritmo fijo
+    refresh_task = asyncio.create_task(orchestrator_service.run_runners_refresh())
+    
     logger.info(format_log('START', 'Servicio FastAPI'))
     
     yield
     
     logger.info(format_log('INFO', 'Deteniendo servicio de orquestador'))
-    orchestrator_service.stop_monitoring()
+    refresh_task.cancel()
+    await asyncio.gather(refresh_task, return_exceptions=True)
+    
+    # Operaciones bloqueantes (join del hilo, Docker) fuera del event loop
+    await asyncio.to_thread(orchestrator_service.stop_monitoring)
     
     # Purge completo de todos los runners al shutdown
     logger.info(format_log('INFO', 'Eliminando todos los runners para evitar huérfanos'))
     try:
-        result = orchestrator_service.lifecycle_manager.purge_all_runners()
+        result = await asyncio.to_thread(orchestrator_service.lifecycle_manager.purge_all_runners)
         logger.info(format_log('SUCCESS', f"Shutdown cleanup: {result['destroyed']}/{result['total']} runners eliminados"))
     except Exception as e:
         logger.error(f"❌ Error en shutdown cleanup: {e}")
     
+    await orchestrator_service.close()
+    
     logger.info(format_log('SUCCESS', 'Servicio detenido completamente'))
 
 
@@ -54,138 +89,180 @@ app = FastAPI(
     description="Servicio para gestionar runners efímeros de GitHub Actions",
     version=__version__,
     lifespan=lifespan,
+    default_response_class=FastORJSONResponse,
 )
 
 
+def get_orchestrator_service(request: Request) -> OrchestratorService:
+    """Dependencia que provee el servicio del orchestrator (sync: sin await)."""
+    return request.app.state.orchestrator_service
+
+
+ServiceDep = Annotated[OrchestratorService, Depends(get_orchestrator_service)]
+
+
 # ===== ENDPOINTS DE RUNNERS =====
 
-@app.post("/runners/create", response_model=List[RunnerResponse])
-async def create_runners(request: RunnerRequest):
+@app.post("/runners/create", response_model=None, responses={200: {"model": List[RunnerResponse]}})
+async def create_runners(request: RunnerRequest, service: ServiceDep):
     """Crea nuevos runners efímeros."""
     try:
-        return await orchestrator_service.create_runners(request)
+        runners = await service.create_runners(request)
+        return FastORJSONResponse(content=runners)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise ErrorHandler.handle_error(e, "creando runners", logger)
+        raise _handle_error(e, "creando runners", logger)
 
 
-@app.get("/runners/{runner_id}/status", response_model=RunnerStatus)
-async def get_runner_status(runner_id: str):
+@app.get("/runners/{runner_id}/status", response_model=None, responses={200: {"model": RunnerStatus}})
+async def get_runner_status(runner_id: str, service: ServiceDep):
     """Obtiene el estado de un runner específico."""
     try:
-        return await orchestrator_service.get_runner_status(runner_id)
+        status = await service.get_runner_status(runner_id)
+        return FastORJSONResponse(content=status)
     except Exception as e:
-        raise ErrorHandler.handle_error(e, "obteniendo estado del runner", logger)
+        raise _handle_error(e, "obteniendo estado del runner", logger)
 
 
 @app.delete("/runners/{runner_id}")
-async def destroy_runner(runner_id: str):
+async def destroy_runner(runner_id: str, service: ServiceDep):
     """Destruye un runner específico."""
     try:
-        return await orchestrator_service.destroy_runner(runner_id)
+        return FastORJSONResponse(content=await service.destroy_runner(runner_id))
+    except RunnerNotFoundError as e:
+        return _not_found_response(e)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        raise ErrorHandler.handle_error(e, "destruyendo runner", logger)
+        raise _handle_error(e, "destruyendo runner", logger)
 
 
-@app.get("/runners", response_model=List[RunnerStatus])
-async def list_runners():
+@app.get("/runners", response_model=None, responses={200: {"model": List[RunnerStatus]}})
+async def list_runners(service: ServiceDep):
     """Lista todos los runners activos."""
     try:
-        return await orchestrator_service.list_runners()
+        # Dicts planos ya normalizados: orjson los codifica sin pasar por modelos
+        return Response(content=json_dumps(await service.list_runners()), media_type="application/json")
     except Exception as e:
-        raise ErrorHandler.handle_error(e, "listando runners", logger)
+        raise _handle_error(e, "listando runners", logger)
 
 
 @app.post("/runners/cleanup")
-async def cleanup_runners():
+async def cleanup_runners(service: ServiceDep):
     """Limpia runners inactivos."""
     try:
-        return await orchestrator_service.cleanup_runners()
+        return FastORJSONResponse(content=await service.cleanup_runners())
     except Exception as e:
-        raise ErrorHandler.handle_error(e, "limpieza de runners", logger)
+        raise _handle_error(e, "limpieza de runners", logger)
 
 
 @app.get("/runners/{runner_name}/debug")
-async def debug_runner_environment(runner_name: str):
+async def debug_runner_environment(runner_name: str, service: ServiceDep):
     """Debug de variables de entorno de un runner."""
     try:
-        env_vars = orchestrator_service.debug_runner_environment(runner_name)
-        return create_response(True, "Environment variables obtenidas", env_vars)
+        return await service.debug_runner_environment(runner_name)
     except Exception as e:
-        raise ErrorHandler.handle_error(e, "debugging runner", logger)
+        raise _handle_error(e, "debugging runner", logger)
 
 @app.get("/runners/{runner_name}/info")
-async def get_runner_detailed_info(runner_name: str):
+async def get_runner_detailed_info(runner_name: str, service: ServiceDep):
     """Obtiene información detallada de un runner."""
     try:
-        info = orchestrator_service.get_runner_detailed_info(runner_name)
-        return create_response(True, "Información detallada obtenida", info)
+        return await service.get_runner_detailed_info(runner_name)
     except Exception as e:
-        raise ErrorHandler.handle_error(e, "obteniendo información del runner", logger)
+        raise _handle_error(e, "obteniendo información del runner", logger)
 
 @app.get("/runners/{runner_name}/logs")
-async def get_runner_logs(runner_name: str):
+async def get_runner_logs(runner_name: str, service: ServiceDep):
     """Obtiene logs de un runner específico."""
     try:
-        return await orchestrator_service.get_runner_logs(runner_name)
+        return await service.get_runner_logs(runner_name)
+    except RunnerNotFoundError as e:
+        return _not_found_response(e)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        raise ErrorHandler.handle_error(e, "obteniendo logs del runner", logger)
+        raise _handle_error(e, "obteniendo logs del runner", logger)
 
 
 # ===== ENDPOINTS DE CONFIGURACIÓN =====
 
-@app.get("/config/info", response_model=ConfigurationInfo)
-async def get_configuration_info():
+@app.get("/config/info", response_model=None, responses={200: {"model": ConfigurationInfo}})
+async def get_configuration_info(service: ServiceDep):
     """Obtiene información de configuración."""
     try:
-        return await orchestrator_service.get_configuration_info()
+        info = await service.get_configuration_info()
+        return FastORJSONResponse(content=info.model_dump(mode="json"))
     except Exception as e:
-        raise ErrorHandler.handle_error(e, "obteniendo información de configuración", logger)
+        raise _handle_error(e, "obteniendo información de configuración", logger)
 
 
-@app.get("/config/validate", response_model=ValidationResult)
-async def validate_configuration():
+@app.get("/config/validate", response_model=None, responses={200: {"model": ValidationResult}})
+async def validate_configuration(service: ServiceDep):
     """Valida la configuración actual."""
     try:
-        return await orchestrator_service.validate_configuration()
+        result = await service.validate_configuration()
+        return FastORJSONResponse(content=result.model_dump(mode="json"))
     except Exception as e:
-        raise ErrorHandler.handle_error(e, "validando configuración", logger)
+        raise _handle_error(e, "validando configuración", logger)
 
 
 @app.get("/config/placeholders")
-async def get_available_placeholders():
-    """Obtiene placeholders disponibles."""
+async def get_available_placeholders(service: ServiceDep):
+    """Obtiene placeholders disponibles (respuesta pre-serializada)."""
     try:
-        return await orchestrator_service.get_available_placeholders()
+        return Response(
+            content=service.placeholders_response_body,
+            media_type="application/json",
+        )
     except Exception as e:
-        raise ErrorHandler.handle_error(e, "obteniendo placeholders", logger)
+        raise _handle_error(e, "obteniendo placeholders", logger)
+
+
+# ===== MONITOREO =====
+
+@app.get("/monitoring/status")
+async def get_monitoring_status(service: ServiceDep):
+    """Contadores y gauges del monitoreo automático."""
+    return service.get_monitoring_status()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(service: ServiceDep):
+    """Métricas en formato de texto Prometheus para scraping."""
+    return Response(
+        content=service.get_prometheus_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
 
 
 # ===== HEALTH CHECKS =====
 
 @app.get("/health")
-async def health_check():
-    """Health check básico del servicio."""
+async def health_check(request: Request, response: Response, service: ServiceDep):
+    """Health check básico del servicio (soporta If-None-Match)."""
     try:
-        return await orchestrator_service.health_check()
+        etag = service.health_etag()
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "max-age=2, must-revalidate"
+        return await service.health_check()
     except Exception as e:
-        raise ErrorHandler.handle_error(e, "health check", logger)
+        raise _handle_error(e, "health check", logger)
 
 
 @app.get("/healthz")
-async def docker_health_check():
+async def docker_health_check(service: ServiceDep):
     """Health check para Docker Engine."""
     try:
-        return await orchestrator_service.docker_health_check()
+        return await service.docker_health_check()
     except ValueError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
-        raise ErrorHandler.handle_error(e, "health check", logger)
+        raise _handle_error(e, "health check", logger)
 
 
 # ===== EJECUCIÓN =====
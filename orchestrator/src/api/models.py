@@ -3,8 +3,9 @@ Modelos de datos para la API del Orchestrator.
 Define las estructuras de datos para requests y respuestas.
 """
 
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
+from typing_extensions import TypedDict
 
 
 class RunnerRequest(BaseModel):
@@ -18,21 +19,35 @@ class RunnerRequest(BaseModel):
     count: int = 1
 
 
-class RunnerResponse(BaseModel):
+# Modelos solo de salida: TypedDict (dicts planos, sin BaseModel.__init__)
+
+class RunnerResponse(TypedDict):
     """Modelo para respuesta de creación de runner."""
     runner_id: str
     status: str
     message: str
 
 
-class RunnerStatus(BaseModel):
+class RunnerStatus(TypedDict):
     """Modelo para estado de un runner."""
     runner_id: str
     status: str
-    container_id: Optional[str] = None
-    image: Optional[str] = None
-    created: Optional[str] = None
-    labels: Optional[Dict] = None
+    container_id: Optional[str]
+    image: Optional[str]
+    created: Optional[str]
+    labels: Optional[Dict]
+
+
+def runner_status(data: Dict[str, Any]) -> RunnerStatus:
+    """Construye RunnerStatus desde el dict del lifecycle (campos ausentes en None)."""
+    return {
+        "runner_id": data["runner_id"],
+        "status": data["status"],
+        "container_id": data.get("container_id"),
+        "image": data.get("image"),
+        "created": data.get("created"),
+        "labels": data.get("labels"),
+    }
 
 
 class ConfigurationInfo(BaseModel):
@@ -0,0 +1,16 @@
+"""
+Clases de respuesta para la API del Orchestrator.
+"""
+
+from typing import Any
+
+from fastapi.responses import ORJSONResponse
+
+from src.utils.helpers import json_dumps
+
+
+class FastORJSONResponse(ORJSONResponse):
+    """ORJSONResponse con las opciones y el default compartidos de json_dumps."""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
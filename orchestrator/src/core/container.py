@@ -1,22 +1,74 @@
 import logging
-import os
+import threading
 import time
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import docker
 from src.services.docker import DockerError, DockerUtils
 from src.services.environment import EnvironmentManager
-from src.utils.helpers import ErrorHandler, setup_logger, validate_runner_name
+from src.utils.helpers import get_env_var, setup_logger, validate_runner_name
 
 logger = setup_logger(__name__)
 
+# Vida del índice runner-name -> contenedor construido con un único listado del daemon
+_CONTAINER_SNAPSHOT_TTL = 2.0
+
+# Espera antes de mostrar la salida inicial del runner (da tiempo a que se registre)
+_STARTUP_LOG_DELAY = 10.0
+
+# Label común a todos los contenedores de runners efímeros
+_RUNNER_LABEL_FILTER = "gha-ephemeral=true"
+
+# Máximo de bytes de logs retenidos por consulta, los más recientes (acota memoria con runners ruidosos)
+_LOGS_MAX_BYTES = 64 * 1024
+
 
 class ContainerManager:
+    __slots__ = ("runner_image", "_client", "_environment_manager", "_init_lock", "_container_snapshot")
+
     def __init__(self, runner_image: str):
-        self.client = docker.from_env()
         self.runner_image = runner_image
-        self.environment_manager = EnvironmentManager(runner_image)
+        # Cliente Docker y EnvironmentManager se crean al primer uso
+        self._client: Optional[Any] = None
+        self._environment_manager: Optional[EnvironmentManager] = None
+        self._init_lock = threading.Lock()
+        # (expira_en, {runner-name: contenedor}); se invalida al crear o detener contenedores
+        self._container_snapshot: Tuple[float, Dict[str, Any]] = (0.0, {})
+
+    @property
+    def client(self) -> Any:
+        """Cliente Docker, conectado al daemon en el primer acceso."""
+        client = self._client
+        if client is None:
+            with self._init_lock:
+                if self._client is None:
+                    try:
+                        self._client = docker.from_env()
+                    except Exception as e:
+                        raise DockerError(f"No se pudo conectar con el daemon de Docker: {e}") from e
+                client = self._client
+        return client
+
+    def ping(self) -> None:
+        """Verifica la conexión con el daemon (abre el cliente si aún no existe)."""
+        try:
+            self.client.ping()
+        except DockerError:
+            raise
+        except Exception as e:
+            raise DockerError(f"Daemon de Docker no responde: {e}") from e
+
+    @property
+    def environment_manager(self) -> EnvironmentManager:
+        """EnvironmentManager del runner, construido en el primer acceso."""
+        manager = self._environment_manager
+        if manager is None:
+            with self._init_lock:
+                if self._environment_manager is None:
+                    self._environment_manager = EnvironmentManager(self.runner_image)
+                manager = self._environment_manager
+        return manager
 
     def create_runner_container(
         self,
@@ -42,7 +94,8 @@ class ContainerManager:
         if runner_group:
             environment["RUNNER_GROUP"] = runner_group
         if labels:
-            environment["RUNNER_LABELS"] = ",".join(labels)
+            # Deduplicar en O(n) preservando el orden (dict como set ordenado)
+            environment["RUNNER_LABELS"] = ",".join(dict.fromkeys(labels))
 
         # Validar y formatear nombre de contenedor
         validated_name = DockerUtils.validate_container_name(runner_name)
@@ -51,17 +104,17 @@ class ContainerManager:
             runner_name=runner_name, scope=scope, scope_name=scope_name
         )
 
-        # Configurar Docker-in-Docker si es necesario
-        volumes = {}
-        security_opt = []
+        # Configurar Docker-in-Docker si es necesario (sin estructuras vacías si no aplica)
+        volumes = None
+        security_opt = None
         
         if enable_dind:
-            volumes['/var/run/docker.sock'] = {'bind': '/var/run/docker.sock', 'mode': 'rw'}
-            security_opt.append('label:disable')
+            volumes = {'/var/run/docker.sock': {'bind': '/var/run/docker.sock', 'mode': 'rw'}}
+            security_opt = ['label:disable']
             logger.info(f"🐳 Habilitando Docker-in-Docker para {runner_name}")
 
         # Configurar comando inyectado si está especificado
-        injected_command = os.getenv("RUNNER_COMMAND")
+        injected_command = get_env_var("RUNNER_COMMAND")
         if injected_command:
             command = injected_command
             logger.info(f"🔍 Aplicando comando: {injected_command}")
@@ -77,25 +130,52 @@ class ContainerManager:
             environment=environment,
             detach=True,
             labels=container_labels,
-            volumes=volumes if volumes else None,
-            security_opt=security_opt if security_opt else None,
+            volumes=volumes,
+            security_opt=security_opt,
         )
 
+        self._container_snapshot = (0.0, {})
         logger.info(f"✅ Contenedor creado: {DockerUtils.format_container_id(container.id)}")
         
         # Esperar a que el contenedor esté completamente iniciado
         if DockerUtils.wait_for_container(container, timeout=30):
-            # Esperar 10 segundos para que el runner genere más logs de configuración
-            time.sleep(10)
-            self.log_container_output(container, runner_name)
+            # Los logs de configuración se muestran 10 s después en segundo plano,
+            # sin retener al llamador (creación de varios runners, ciclo de monitoreo).
+            # Sin INFO habilitado no se programa el hilo ni se consulta al daemon.
+            if logger.isEnabledFor(logging.INFO):
+                log_timer = threading.Timer(
+                    _STARTUP_LOG_DELAY, self.log_container_output, args=(container, runner_name)
+                )
+                log_timer.daemon = True
+                log_timer.start()
         else:
             logger.error(f"❌ Runner {runner_name} falló al iniciar correctamente")
         
         return container
 
+    def snapshot_runner_containers(self) -> Dict[str, Any]:
+        """Índice runner-name -> contenedor (incluye detenidos) desde un único listado sparse."""
+        now = time.monotonic()
+        expires_at, snapshot = self._container_snapshot
+        if now < expires_at:
+            return snapshot
+
+        containers = self.list_containers(all_containers=True, sparse=True)
+        snapshot = {}
+        for container in containers:
+            runner_name = (container.attrs.get("Labels") or {}).get("runner-name")
+            if runner_name:
+                snapshot[runner_name] = container
+        self._container_snapshot = (now + _CONTAINER_SNAPSHOT_TTL, snapshot)
+        return snapshot
+
     def get_runner_container(self, runner_name: str) -> Any:
         """Obtiene un contenedor específico por nombre de runner."""
         try:
+            container = self.snapshot_runner_containers().get(runner_name)
+            if container is not None:
+                return container if container.attrs.get("State") == "running" else None
+            # No indexado (p.ej. sin label gha-ephemeral): consulta directa
             containers = self.client.containers.list(
                 all=False, filters={"label": f"runner-name={runner_name}"}
             )
@@ -104,22 +184,49 @@ class ContainerManager:
             logger.error(f"Error obteniendo contenedor {runner_name}: {e}")
             return None
 
+    def list_containers(
+        self,
+        extra_labels: Optional[Dict[str, str]] = None,
+        all_containers: bool = False,
+        sparse: bool = False,
+    ) -> List[Any]:
+        """
+        Lista contenedores de runners con una sola llamada al daemon.
+
+        Los labels adicionales se combinan con gha-ephemeral=true en el mismo
+        filtro (Docker exige que coincidan todos).
+        """
+        label_filters = [_RUNNER_LABEL_FILTER]
+        if extra_labels:
+            label_filters.extend(f"{key}={value}" for key, value in extra_labels.items())
+        return self.client.containers.list(
+            all=all_containers, filters={"label": label_filters}, sparse=sparse
+        )
+
     def get_runner_containers(self) -> List[Any]:
         """Obtiene todos los contenedores de runners efímeros activos."""
         try:
-            containers = self.client.containers.list(
-                all=False, filters={"label": "gha-ephemeral=true"}
-            )
-            return containers
+            return self.list_containers()
         except Exception as e:
             logger.error(f"Error obteniendo contenedores: {e}")
             return []
 
+    def get_runner_containers_info(self) -> List[Dict[str, Any]]:
+        """Obtiene el resumen de los runners activos con una sola llamada al daemon."""
+        try:
+            # sparse=True evita el inspect por contenedor que hace containers.list
+            containers = self.list_containers(sparse=True)
+        except Exception as e:
+            logger.error(f"Error obteniendo contenedores: {e}")
+            return []
+        return [DockerUtils.get_container_summary(container) for container in containers]
+
     def stop_container(self, container: Any, timeout: int = 30) -> bool:
         """Detiene y elimina un contenedor."""
         try:
             container.stop(timeout=timeout)
             container.remove(force=True)
+            self._container_snapshot = (0.0, {})
             return True
         except Exception as e:
             logger.error(f"Error deteniendo contenedor: {e}")
@@ -128,36 +235,46 @@ class ContainerManager:
     def get_container_logs(self, container: Any, tail: int = 50) -> str:
         """Obtiene logs de un contenedor directamente."""
         try:
-            logs = container.logs(tail=tail)
-            if isinstance(logs, bytes):
-                return logs.decode("utf-8", errors="replace")
-            else:
-                return str(logs)
+            # follow=False: con stream=True el SDK seguiría el log indefinidamente
+            stream = container.logs(tail=tail, stream=True, follow=False)
+            buffer = bytearray()
+            try:
+                for chunk in stream:
+                    buffer += chunk if isinstance(chunk, bytes) else str(chunk).encode()
+                    # Conservar los bytes más recientes: se descarta desde el inicio
+                    if len(buffer) > _LOGS_MAX_BYTES:
+                        del buffer[:-_LOGS_MAX_BYTES]
+            finally:
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+            # Un único decode al final; errors="replace" evita fallar en cortes multibyte
+            return buffer.decode("utf-8", errors="replace")
         except Exception as e:
             logger.error(f"Error obteniendo logs del contenedor: {e}")
             return f"Error obteniendo logs: {str(e)}"
 
     def log_container_output(self, container: Any, runner_name: str) -> None:
-        """Muestra logs del contenedor sin filtrar (salida raw)."""
+        """Muestra logs del contenedor sin filtrar (salida raw) en un único registro."""
         try:
-            print(f"📋 Salida del Runner: {runner_name}")
-            print("")
-            
             logs = self.get_container_logs(container, tail=200)
-            if logs and logs != "Error obteniendo logs":
-                for line in logs.split("\n"):
-                    if line.strip():
-                        print(f"  {runner_name} | {line.strip()}")
+            if not logs or logs.startswith("Error obteniendo logs"):
+                return
             
-            print("")
+            prefix = f"  {runner_name} | "
+            output = "\n".join(prefix + line for line in map(str.strip, logs.splitlines()) if line)
+            logger.info("📋 Salida del Runner: %s\n%s", runner_name, output)
             
         except Exception as e:
-            print(f"❌ Error obteniendo logs del contenedor {runner_name}: {e}")
+            logger.error(f"❌ Error obteniendo logs del contenedor {runner_name}: {e}")
 
     
     def get_container_by_name(self, name: str) -> Any:
         """Obtiene un contenedor por su nombre."""
         try:
+            container = self.snapshot_runner_containers().get(name)
+            if container is not None:
+                return container
             containers = self.client.containers.list(
                 all=True, filters={"name": name}
             )
@@ -2,7 +2,7 @@ import logging
 import requests
 from typing import List, Dict
 from src.services.tokens import TokenGenerator
-from src.utils.helpers import format_log, setup_logger
+from src.utils.helpers import format_log, json_loads, setup_logger
 
 logger = setup_logger(__name__)
 
@@ -10,8 +10,11 @@ logger = setup_logger(__name__)
 class GitHubRunnerCleanup:
     """Maneja la limpieza de runners offline en GitHub API."""
     
-    def __init__(self, github_runner_token: str):
-        self.token_generator = TokenGenerator(github_runner_token)
+    __slots__ = ("token_generator",)
+    
+    def __init__(self, token_generator: TokenGenerator):
+        # Reutiliza el TokenGenerator del lifecycle para no duplicar clientes HTTP
+        self.token_generator = token_generator
     
     def get_all_runners_from_github(self, scope: str, scope_name: str) -> List[Dict]:
         """Obtiene todos los runners (online y offline) desde GitHub API."""
@@ -23,16 +26,19 @@ class GitHubRunnerCleanup:
             else:
                 url = f"{self.token_generator.api_base}/user/actions/runners"
             
-            response = requests.get(url, headers=self.token_generator.headers, timeout=30.0)
+            # Máximo por página (default de la API: 30)
+            response = requests.get(
+                url, headers=self.token_generator.headers, params={"per_page": 100}, timeout=30.0
+            )
             
             if response.status_code == 200:
-                data = response.json()
+                data = json_loads(response.content)
                 return data.get("runners", [])
             else:
                 logger.error(f"Error obteniendo runners de GitHub: {response.status_code}")
                 return []
                 
-        except Exception as e:
+        except (requests.RequestException, ValueError) as e:
             logger.error(f"Error consultando GitHub API: {e}")
             return []
     
@@ -63,7 +69,7 @@ class GitHubRunnerCleanup:
                 logger.error(f"Error eliminando runner {runner_id}: {response.status_code}")
                 return False
                 
-        except Exception as e:
+        except requests.RequestException as e:
             logger.error(f"Error eliminando runner {runner_id}: {e}")
             return False
     
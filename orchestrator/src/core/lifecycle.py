@@ -1,8 +1,11 @@
 import logging
 import os
+import re
 import threading
 import time
-from typing import Any, Dict, List, Optional
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
 from functools import wraps
 
 import requests
@@ -10,10 +13,51 @@ from src.core.container import ContainerManager
 from src.core.github_cleanup import GitHubRunnerCleanup
 from src.services.docker import DockerUtils
 from src.services.tokens import TokenGenerator
-from src.utils.helpers import format_log, setup_logger
+from src.utils.helpers import format_log, get_env_int, json_loads, setup_logger
+from src.utils.metrics import MetricsRegistry
 
 logger = setup_logger(__name__)
 
+# Configuración de descubrimiento y limpieza: el entorno del contenedor no cambia en
+# ejecución, así que se lee y convierte una sola vez al importar
+_DISCOVERY_MODE = os.getenv("DISCOVERY_MODE", "all")
+_GITHUB_ORGANIZATION = os.getenv("GITHUB_ORGANIZATION")
+_GITHUB_CLEANUP_ENABLED = os.getenv("GITHUB_CLEANUP_ENABLED", "false").lower() == "true"
+
+# Repos analizados en paralelo contra la GitHub API en cada ciclo de descubrimiento
+_DISCOVERY_CONCURRENCY = get_env_int("DISCOVERY_CONCURRENCY", 8, minimum=1)
+
+# Contenedores detenidos en paralelo durante limpieza y purge (stop+remove son independientes)
+_DESTROY_CONCURRENCY = 8
+
+# Vida de los conteos de workflow runs cacheados (menor que cualquier intervalo de ciclo)
+_WORKFLOW_COUNT_TTL = 15.0
+
+# Patrones buscados en el contenido de los workflows
+_SELF_HOSTED_PATTERNS = (
+    "runs-on: self-hosted",
+    'runs-on: ["self-hosted"',
+    'runs-on: [ "self-hosted"',
+)
+_DIND_PATTERNS = (
+    "docker/setup-buildx-action@",
+    "docker/login-action@",
+    "docker/build-push-action@",
+    "docker run ",
+    "docker build ",
+    "docker push ",
+    "docker pull ",
+    "docker login ",
+    "docker logout ",
+)
+# Cada familia de patrones compilada en una sola alternancia: una pasada en C por archivo
+_SELF_HOSTED_RE = re.compile("|".join(map(re.escape, _SELF_HOSTED_PATTERNS)))
+_DIND_RE = re.compile("|".join(map(re.escape, _DIND_PATTERNS)))
+_WORKFLOW_SUFFIXES = (".yml", ".yaml")
+
+# Descargas de archivos de workflow compartidas por todos los repos en análisis
+_WORKFLOW_FETCH_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="workflow-fetch")
+
 
 def handle_lifecycle_errors(func):
     """Decorador para manejar errores estandarizados."""
@@ -31,20 +75,64 @@ class LifecycleManager:
     def __init__(self, github_runner_token: str, runner_image: str):
         self.token_generator = TokenGenerator(github_runner_token)
         self.container_manager = ContainerManager(runner_image)
-        self.github_cleanup = GitHubRunnerCleanup(github_runner_token)
+        self.github_cleanup = GitHubRunnerCleanup(self.token_generator)
+        # Copy-on-write: nunca se muta en sitio, se reemplaza la referencia completa.
+        # Los lectores iteran su propia copia sin lock.
         self.active_runners: Dict[str, Any] = {}
+        # Índice repo -> runner_ids, publicado junto con active_runners (también copy-on-write)
+        self.runners_by_repo: Dict[str, FrozenSet[str]] = {}
+        self.state_version = 0  # Se incrementa en cada cambio de active_runners
+        self._state_lock = threading.Lock()  # Serializa solo a los escritores de active_runners
         self.runner_lock = threading.Lock()  # ← Bloqueo atómico para race conditions
         self.monitoring = False
         self.monitor_thread: Optional[threading.Thread] = None
+        self.metrics = MetricsRegistry()  # Leído por la API sin pasar por el lifecycle
+        # (repo, status) -> (expira_en, conteo, etag); evita repetir la misma consulta dentro de
+        # un ciclo y, vencido el TTL, permite revalidar con If-None-Match
+        self._workflow_count_cache: Dict[Tuple[str, str], Tuple[float, int, Optional[str]]] = {}
+        # Lo escriben el pool de discovery, el de destrucción y los handlers de la API
+        self._workflow_count_lock = threading.Lock()
+
+    def _add_active_runner(self, runner_id: str, container: Any) -> None:
+        """Registra un runner publicando una nueva copia de active_runners."""
+        repo = DockerUtils.get_cached_labels(container).get("repo")
+        with self._state_lock:
+            runners = dict(self.active_runners)
+            runners[runner_id] = container
+            if repo:
+                by_repo = dict(self.runners_by_repo)
+                by_repo[repo] = by_repo.get(repo, frozenset()) | {runner_id}
+                self.runners_by_repo = by_repo
+            self.active_runners = runners
+            self.state_version += 1
+            # Dentro del lock: actualizaciones concurrentes no fijan el gauge fuera de orden
+            self.metrics.active_runners.set(len(runners))
+        self.metrics.runners_created_total.inc()
+
+    def _remove_active_runner(self, runner_id: str) -> None:
+        """Quita un runner publicando una nueva copia de active_runners."""
+        with self._state_lock:
+            # Una sola búsqueda por diccionario (get en lugar de in + indexado)
+            container = self.active_runners.get(runner_id)
+            if container is None:
+                return
+            runners = dict(self.active_runners)
+            del runners[runner_id]
+            repo = DockerUtils.get_cached_labels(container).get("repo")
+            repo_runner_ids = self.runners_by_repo.get(repo)
+            if repo_runner_ids is not None:
+                by_repo = dict(self.runners_by_repo)
+                remaining = repo_runner_ids - {runner_id}
+                if remaining:
+                    by_repo[repo] = remaining
+                else:
+                    del by_repo[repo]
+                self.runners_by_repo = by_repo
+            self.active_runners = runners
+            self.state_version += 1
+            self.metrics.active_runners.set(len(runners))
+        self.metrics.runners_destroyed_total.inc()
 
-    def _github_api_call(self, endpoint: str, params: Dict = None) -> Dict:
-        """Método genérico para llamadas a GitHub API."""
-        url = f"{self.token_generator.api_base}/{endpoint}"
-        response = requests.get(url, headers=self.token_generator.headers, 
-                              params=params, timeout=30.0)
-        return response.json() if response.status_code == 200 else {}
-
-    
     @handle_lifecycle_errors
     def create_runner(
         self,
@@ -54,11 +142,13 @@ class LifecycleManager:
         runner_group: Optional[str] = None,
         labels: Optional[List[str]] = None,
         enable_dind: bool = False,
+        registration_token: Optional[str] = None,
     ) -> str:
         """Crea un runner efímero."""
         logger.info(f"🚀 Creando runner para {scope}/{scope_name}")
         
-        registration_token = self.token_generator.generate_registration_token(scope, scope_name)
+        if not registration_token:
+            registration_token = self.token_generator.generate_registration_token_sync(scope, scope_name)
         container = self.container_manager.create_runner_container(
             registration_token=registration_token,
             scope=scope,
@@ -69,10 +159,12 @@ class LifecycleManager:
             enable_dind=enable_dind,
         )
 
-        labels = DockerUtils.get_container_labels(container)
-        runner_id = labels.get("runner-name", container.id[:12]) if labels else container.id[:12]
-        self.active_runners[runner_id] = container
+        # Labels e ID corto se resuelven una vez; el contenedor recién creado ya trae sus attrs
         container_id = DockerUtils.format_container_id(container.id)
+        runner_id = DockerUtils.get_cached_labels(container).get("runner-name") or container_id
+        self._add_active_runner(runner_id, container)
+        if scope == "repo":
+            self._invalidate_workflow_counts(scope_name)
         logger.info(f"✅ Runner creado: {runner_id} (container: {container_id})")
         return runner_id
 
@@ -110,7 +202,7 @@ class LifecycleManager:
             return False
 
         try:
-            container.reload()
+            DockerUtils.refresh(container)
             status = container.status
             container_id = DockerUtils.format_container_id(container.id)
             logger.info(f"🐳 Estado: {status} (ID: {container_id})")
@@ -121,7 +213,10 @@ class LifecycleManager:
         success = self.container_manager.stop_container(container)
         
         if success:
-            self.active_runners.pop(runner_id, None)
+            self._remove_active_runner(runner_id)
+            repo = DockerUtils.get_cached_labels(container).get("repo")
+            if repo:
+                self._invalidate_workflow_counts(repo)
             logger.info(f"✅ Runner destruido: {runner_id}")
         else:
             logger.error(f"❌ No se pudo destruir el runner {runner_id}")
@@ -131,16 +226,18 @@ class LifecycleManager:
     @handle_lifecycle_errors
     def list_active_runners(self) -> List[Dict]:
         """Lista todos los runners activos."""
-        containers = self.container_manager.get_runner_containers()
-        runner_statuses = []
-        for container in containers:
-            labels = DockerUtils.get_container_labels(container)
-            if isinstance(labels, dict):
-                runner_id = labels.get("runner-name", container.id[:12])
-            else:
-                runner_id = container.id[:12]
-            runner_statuses.append(self.get_runner_status(runner_id))
-        return runner_statuses
+        # Un único listado del daemon; sin reload/inspect por runner
+        return [
+            {
+                "status": "running" if info["status"] == "running" else "stopped",
+                "runner_id": info["labels"].get("runner-name", info["id"]),
+                "container_id": info["id"],
+                "image": info["image"],
+                "created": info["created"],
+                "labels": info["labels"],
+            }
+            for info in self.container_manager.get_runner_containers_info()
+        ]
 
     @handle_lifecycle_errors
     def cleanup_inactive_runners(self) -> int:
@@ -150,33 +247,40 @@ class LifecycleManager:
         cleaned_count = 0
         runners_to_remove = []
 
-        for runner_id, container in self.active_runners.items():
+        runners_by_repo: Dict[str, List[str]] = {}
+
+        active_runners = self.active_runners  # Snapshot estable durante el análisis
+        for runner_id, container in active_runners.items():
             try:
-                container.reload()
+                DockerUtils.refresh(container)
                 
                 if not DockerUtils.is_container_running(container):
                     logger.info(f"💀 Runner {runner_id} está muerto, se eliminará")
                     runners_to_remove.append(runner_id)
                     continue
                 
-                labels = DockerUtils.get_container_labels(container)
-                if isinstance(labels, dict):
-                    repo = labels.get("repo")
-                    if repo and self.get_active_workflows_for_repo(repo) == 0:
-                        runners_to_remove.append(runner_id)
+                repo = DockerUtils.get_container_labels(container).get("repo")
+                if repo:
+                    runners_by_repo.setdefault(repo, []).append(runner_id)
                         
             except Exception as e:
                 logger.error(f"❌ Error analizando runner {runner_id}: {e}")
                 runners_to_remove.append(runner_id)
 
-        logger.info(format_log('INFO', f'Análisis: {len(self.active_runners) - len(runners_to_remove)} activos, {len(runners_to_remove)} para eliminar'))
-
-        for runner_id in runners_to_remove:
+        # Una consulta a GitHub por repo distinto, compartida por todos sus runners
+        for repo, runner_ids in runners_by_repo.items():
             try:
-                if self.destroy_runner(runner_id):
-                    cleaned_count += 1
+                if self.get_active_workflows_for_repo(repo) == 0:
+                    runners_to_remove.extend(runner_ids)
             except Exception as e:
-                logger.error(f"❌ Error eliminando runner {runner_id}: {e}")
+                logger.error(f"❌ Error consultando workflows de {repo}: {e}")
+                runners_to_remove.extend(runner_ids)
+
+        logger.info(format_log('INFO', f'Análisis: {len(active_runners) - len(runners_to_remove)} activos, {len(runners_to_remove)} para eliminar'))
+
+        if runners_to_remove:
+            with ThreadPoolExecutor(max_workers=_DESTROY_CONCURRENCY, thread_name_prefix="destroy") as pool:
+                cleaned_count = sum(pool.map(self._safe_destroy_runner, runners_to_remove))
 
         if cleaned_count > 0:
             logger.info(format_log('SUCCESS', f'{cleaned_count} runners purgados'))
@@ -188,12 +292,18 @@ class LifecycleManager:
         
         return cleaned_count
 
+    def _safe_destroy_runner(self, runner_id: str) -> bool:
+        """destroy_runner que registra el error y retorna False en lugar de propagarlo."""
+        try:
+            return self.destroy_runner(runner_id)
+        except Exception as e:
+            logger.error(f"❌ Error eliminando runner {runner_id}: {e}")
+            return False
+
     def cleanup_github_offline_runners(self, dry_run: bool = False) -> Dict[str, int]:
         """Limpia runners offline de GitHub API."""
         try:
-            github_cleanup_enabled = os.getenv("GITHUB_CLEANUP_ENABLED", "false").lower() == "true"
-            
-            if not github_cleanup_enabled:
+            if not _GITHUB_CLEANUP_ENABLED:
                 logger.debug("GitHub cleanup desactivado (GITHUB_CLEANUP_ENABLED=false)")
                 return {"total": 0, "cleaned": 0, "failed": 0}
             
@@ -222,22 +332,13 @@ class LifecycleManager:
         
         logger.info(format_log('INFO', f'Eliminando {total_runners} runners'))
         
-        destroyed_count = 0
-        failed_count = 0
-        
-        # Eliminar cada runner sin verificar estado
-        for runner_id in all_runner_ids:
-            try:
-                # Usar destroy_runner existente (maneja cualquier estado)
-                if self.destroy_runner(runner_id):
-                    destroyed_count += 1
-                    logger.info(f"🗑️ Runner {runner_id} eliminado")
-                else:
-                    failed_count += 1
-                    logger.warning(f"⚠️ No se pudo eliminar runner {runner_id}")
-            except Exception as e:
-                failed_count += 1
-                logger.error(f"❌ Error eliminando runner {runner_id}: {e}")
+        # Eliminar todos los runners en paralelo sin verificar estado
+        # (destroy_runner maneja cualquier estado)
+        with ThreadPoolExecutor(max_workers=_DESTROY_CONCURRENCY, thread_name_prefix="destroy") as pool:
+            results = list(pool.map(self._safe_destroy_runner, all_runner_ids))
+
+        destroyed_count = sum(results)
+        failed_count = total_runners - destroyed_count
         
         logger.info(format_log('SUCCESS', f'Purge completado: {destroyed_count}/{total_runners} runners eliminados'))
         
@@ -254,6 +355,7 @@ class LifecycleManager:
             return
 
         self.monitoring = True
+        self.metrics.monitor_active.set(1)
         self.monitor_thread = threading.Thread(
             target=self._monitor_loop, args=(cleanup_interval,), daemon=True
         )
@@ -263,6 +365,7 @@ class LifecycleManager:
     def stop_monitoring(self):
         """Detiene el monitoreo automático."""
         self.monitoring = False
+        self.metrics.monitor_active.set(0)
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
         logger.info(format_log('SUCCESS', 'Monitoreo detenido'))
@@ -272,6 +375,8 @@ class LifecycleManager:
         purge_interval = int(os.getenv("RUNNER_PURGE_INTERVAL", "300"))
         
         logger.info(format_log('MONITOR', 'Iniciando sistema automático', f'limpieza={purge_interval}s, creación={cleanup_interval}s'))
+        sleep_time = min(purge_interval, cleanup_interval)
+        self.metrics.monitor_interval_seconds.set(sleep_time)
         
         while self.monitoring:
             try:
@@ -279,14 +384,15 @@ class LifecycleManager:
                     self.cleanup_inactive_runners()
                     self.check_and_create_runners_for_jobs()
                 
+                self.metrics.monitor_cycles_total.inc()
                 active_count = len(self.active_runners)
                 logger.info(format_log('INFO', f'Estado: {active_count} runners activos'))
                 
-                sleep_time = min(purge_interval, cleanup_interval)
                 logger.info(format_log('INFO', f'Próximo ciclo en {sleep_time}s'))
                 time.sleep(sleep_time)
                 
             except Exception as e:
+                self.metrics.monitor_errors_total.inc()
                 logger.error(format_log('ERROR', f'Error en ciclo de monitoreo', str(e)))
                 logger.info(format_log('INFO', 'Esperando 60s antes de reintentar'))
                 time.sleep(60)
@@ -301,53 +407,74 @@ class LifecycleManager:
 
         logger.info(f"🔍 Analizando {len(repos)} repositorios...")
         
-        repos_with_runners = 0
         repos_with_jobs = 0
         runners_created = 0
+        # Un solo timestamp por ciclo; el sufijo aleatorio por lote evita colisiones
+        # entre repos que crean runners en el mismo segundo
+        batch_ts = int(time.time())
+
+        # Fase de red (GitHub API) en paralelo; la creación de runners sigue siendo secuencial
+        with ThreadPoolExecutor(max_workers=_DISCOVERY_CONCURRENCY, thread_name_prefix="discovery") as pool:
+            analyses = [(repo, pool.submit(self._analyze_repo, repo)) for repo in repos]
+
+            for repo, analysis in analyses:
+                try:
+                    result = analysis.result()
+                    # _analyze_repo solo retorna repos self-hosted con jobs en cola
+                    if result is None:
+                        continue
+                    needs_dind, queued_jobs = result
+                    repos_with_jobs += 1
 
-        for repo in repos:
-            try:
-                if self.repo_uses_self_hosted_runners(repo):
-                    repos_with_runners += 1
-                    
-                    # Detectar si necesita Docker-in-Docker
-                    needs_dind = self.repo_needs_docker_in_docker(repo)
-                    
                     if needs_dind:
                         logger.info(f"🐳 {repo}: Detectado Docker-in-Docker")
                     else:
                         logger.info(f"🏃 {repo}: Runner estándar")
-                    
-                    queued_jobs = self.get_queued_jobs_for_repo(repo)
+                    logger.info(f"🔄 {repo}: {queued_jobs} jobs en cola")
 
-                    if queued_jobs > 0:
-                        repos_with_jobs += 1
-                        logger.info(f"🔄 {repo}: {queued_jobs} jobs en cola")
+                    active_runners = self._count_runners_for_repo(repo)
 
-                        active_runners = sum(1 for runner_id, container in self.active_runners.items()
-                                          if self._runner_belongs_to_repo(container, repo))
+                    logger.info(f"📊 {repo}: {active_runners} runners vs {queued_jobs} jobs")
 
-                        logger.info(f"📊 {repo}: {active_runners} runners vs {queued_jobs} jobs")
+                    if active_runners < queued_jobs:
+                        needed = queued_jobs - active_runners
+                        logger.info(f"🚀 {repo}: Creando {needed} runners")
 
-                        if active_runners < queued_jobs:
-                            needed = queued_jobs - active_runners
-                            logger.info(f"🚀 {repo}: Creando {needed} runners")
+                        batch_prefix = f"auto-runner-{batch_ts}-{uuid.uuid4().hex[:6]}"
+                        for i in range(needed):
+                            runner_name = f"{batch_prefix}-{i}"
+                            try:
+                                runner_id = self.create_runner(
+                                    scope="repo", scope_name=repo, runner_name=runner_name, enable_dind=needs_dind
+                                )
+                                runners_created += 1
+                            except Exception as e:
+                                logger.error(f"❌ Error creando runner para {repo}: {e}")
 
-                            for i in range(needed):
-                                runner_name = f"auto-runner-{int(time.time())}-{i}"
-                                try:
-                                    runner_id = self.create_runner(
-                                        scope="repo", scope_name=repo, runner_name=runner_name, enable_dind=needs_dind
-                                    )
-                                    runners_created += 1
-                                except Exception as e:
-                                    logger.error(f"❌ Error creando runner para {repo}: {e}")
-
-            except Exception as e:
-                logger.error(f"❌ Error procesando repo {repo}: {e}")
-                continue
+                except Exception as e:
+                    logger.error(f"❌ Error procesando repo {repo}: {e}")
+                    continue
 
-        logger.info(f"📊 Resumen: {repos_with_runners} repos con runners, {repos_with_jobs} con jobs, {runners_created} runners creados")
+        logger.info(f"📊 Resumen: {repos_with_jobs} repos self-hosted con jobs en cola, {runners_created} runners creados")
+
+    def _analyze_repo(self, repo: str) -> Optional[Tuple[bool, int]]:
+        """Consulta GitHub para un repo: (needs_dind, jobs en cola), o None si no hay demanda self-hosted."""
+        # Primero el conteo (una llamada barata y cacheada): sin jobs en cola no se descargan workflows
+        queued_jobs = self.get_queued_jobs_for_repo(repo)
+        if queued_jobs == 0:
+            return None
+        uses_self_hosted, needs_dind = self.scan_repo_workflows(repo)
+        if not uses_self_hosted:
+            return None
+        return needs_dind, queued_jobs
+
+    def _count_runners_for_repo(self, repo: str) -> int:
+        """Cuenta los runners vivos de un repo recorriendo solo su entrada del índice."""
+        runners = self.active_runners
+        return sum(
+            1 for runner_id in self.runners_by_repo.get(repo, ())
+            if runner_id in runners and self._runner_belongs_to_repo(runners[runner_id], repo)
+        )
 
     def _runner_belongs_to_repo(self, container: Any, repo: str) -> bool:
         """Verifica si un runner pertenece a un repositorio."""
@@ -355,17 +482,12 @@ class LifecycleManager:
             if not DockerUtils.is_container_running(container):
                 return False
             
-            labels = DockerUtils.get_container_labels(container)
-            if isinstance(labels, dict):
-                return labels.get("repo") == repo or labels.get("scope_name") == repo
-            return False
-        except:
-            labels = DockerUtils.get_container_labels(container)
-            if isinstance(labels, dict):
-                runner_id = labels.get("runner-name", container.id[:12])
-            else:
-                runner_id = container.id[:12]
-            self.active_runners.pop(runner_id, None)
+            # is_container_running acaba de refrescar attrs: no hace falta otra consulta
+            labels = DockerUtils.get_cached_labels(container)
+            return labels.get("repo") == repo or labels.get("scope_name") == repo
+        except Exception:
+            runner_id = DockerUtils.get_cached_labels(container).get("runner-name")
+            self._remove_active_runner(runner_id or DockerUtils.format_container_id(container.id))
             return False
 
     def get_runner_detailed_info(self, runner_name: str) -> Dict:
@@ -392,157 +514,173 @@ class LifecycleManager:
 
     def get_user_repositories(self) -> List[str]:
         """Obtiene todos los repositorios accesibles del usuario."""
-        discovery_mode = os.getenv("DISCOVERY_MODE", "all")
+        if _DISCOVERY_MODE != "organization":
+            return self._get_user_repositories()
 
-        if discovery_mode == "organization":
-            org_repos = self.get_organization_repositories()
-            user_repos = self._get_user_repositories()
-            return list(set(org_repos + user_repos))
-        else:
+        if not _GITHUB_ORGANIZATION:
+            # Sin organización ambos listados serían los repos personales: se pagina una sola vez
+            logger.warning("⚠️ GITHUB_ORGANIZATION no configurado, usando repositorios personales")
             return self._get_user_repositories()
 
-    def _get_user_repositories(self) -> List[str]:
-        """Obtiene todos los repositorios personales del usuario."""
-        repos = []
-        page = 1
+        # Ambos listados son independientes: se paginan concurrentemente
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="discovery") as pool:
+            org_future = pool.submit(self.get_organization_repositories)
+            user_future = pool.submit(self._get_user_repositories)
+            # Unión directa en un set, sin la lista concatenada intermedia
+            return list({*org_future.result(), *user_future.result()})
+
+    def _iter_paginated(self, endpoint: str, params: Dict[str, Any]) -> Iterator[Dict]:
+        """Recorre un listado paginado de GitHub de forma perezosa (una página en memoria a la vez)."""
         per_page = 100
+        url = f"{self.token_generator.api_base}/{endpoint}"
+        page = 1
 
         while True:
-            url = f"{self.token_generator.api_base}/user/repos"
             response = requests.get(
                 url,
                 headers=self.token_generator.headers,
-                params={"type": "owner", "page": page, "per_page": per_page},
+                params={**params, "page": page, "per_page": per_page},
                 timeout=30.0,
             )
 
             if response.status_code != 200:
-                break
+                return
 
-            page_repos = response.json()
-            if not page_repos:
-                break
+            items = json_loads(response.content)
+            if not items:
+                return
 
-            repos.extend([repo["full_name"] for repo in page_repos])
+            yield from items
+            # Página incompleta = última página: evita pedir una vacía extra
+            if len(items) < per_page:
+                return
             page += 1
 
-        return repos
+    def _get_user_repositories(self) -> List[str]:
+        """Obtiene todos los repositorios personales del usuario."""
+        return [repo["full_name"] for repo in self._iter_paginated("user/repos", {"type": "owner"})]
 
     def get_organization_repositories(self) -> List[str]:
         """Obtiene todos los repositorios de la organización."""
         try:
-            org_name = os.getenv("GITHUB_ORGANIZATION")
+            org_name = _GITHUB_ORGANIZATION
             if not org_name:
                 logger.warning("⚠️ GITHUB_ORGANIZATION no configurado, usando repositorios personales")
                 return self._get_user_repositories()
             
-            repos = []
-            page = 1
-            per_page = 100
-            
-            while True:
-                url = f"{self.token_generator.api_base}/orgs/{org_name}/repos"
-                response = requests.get(
-                    url,
-                    headers=self.token_generator.headers,
-                    params={"type": "all", "page": page, "per_page": per_page},
-                    timeout=30.0
-                )
-                
-                if response.status_code != 200:
-                    break
-                
-                data = response.json()
-                if not data:
-                    break
-                
-                repos.extend([f"{repo['owner']['login']}/{repo['name']}" for repo in data])
-                page += 1
+            repos = [
+                f"{repo['owner']['login']}/{repo['name']}"
+                for repo in self._iter_paginated(f"orgs/{org_name}/repos", {"type": "all"})
+            ]
             
             logger.info(f"📁 Encontrados {len(repos)} repositorios de organización")
             return repos
-        except Exception as e:
+        except (requests.RequestException, ValueError, KeyError) as e:
             logger.error(f"❌ Error obteniendo repositorios de organización: {e}")
             return []
 
     def repo_uses_self_hosted_runners(self, repo: str) -> bool:
         """Verifica si un repositorio usa self-hosted runners."""
-        try:
-            owner, name = repo.split("/")
-            url = f"{self.token_generator.api_base}/repos/{owner}/{name}/contents/.github/workflows"
-            response = requests.get(url, headers=self.token_generator.headers, timeout=30.0)
-
-            if response.status_code != 200:
-                return False
-
-            workflows = response.json()
-            for workflow in workflows:
-                if workflow.get("name", "").endswith((".yml", ".yaml")):
-                    workflow_url = workflow.get("download_url")
-                    if workflow_url:
-                        workflow_response = requests.get(
-                            workflow_url, headers=self.token_generator.headers, timeout=30.0
-                        )
-
-                        if workflow_response.status_code == 200:
-                            content = workflow_response.text
-                            if any(pattern in content for pattern in [
-                                "runs-on: self-hosted",
-                                'runs-on: ["self-hosted"',
-                                'runs-on: [ "self-hosted"'
-                            ]):
-                                logger.debug(f"Repo {repo} usa self-hosted runners")
-                                return True
-
-            return False
-
-        except Exception as e:
-            logger.debug(f"Error verificando workflow de {repo}: {e}")
-            return False
+        return self.scan_repo_workflows(repo)[0]
 
     def repo_needs_docker_in_docker(self, repo: str) -> bool:
         """Verifica si un repositorio necesita Docker-in-Docker."""
+        return self.scan_repo_workflows(repo)[1]
+
+    def scan_repo_workflows(self, repo: str) -> Tuple[bool, bool]:
+        """
+        Analiza los workflows de un repositorio en una sola pasada.
+
+        Returns:
+            (usa self-hosted runners, necesita Docker-in-Docker)
+        """
+        uses_self_hosted = False
+        needs_dind = False
         try:
             owner, name = repo.split("/")
             url = f"{self.token_generator.api_base}/repos/{owner}/{name}/contents/.github/workflows"
             response = requests.get(url, headers=self.token_generator.headers, timeout=30.0)
-            
+
             if response.status_code != 200:
-                return False
-                
-            workflows = response.json()
-            for workflow in workflows:
-                if workflow.get("name", "").endswith((".yml", ".yaml")):
-                    workflow_url = workflow.get("download_url")
-                    if workflow_url:
-                        workflow_response = requests.get(
-                            workflow_url, headers=self.token_generator.headers, timeout=30.0
-                        )
-                        
-                        if workflow_response.status_code == 200:
-                            content = workflow_response.text
-                            if any(pattern in content for pattern in [
-                                "docker/setup-buildx-action@",
-                                "docker/login-action@",
-                                "docker/build-push-action@",
-                                "docker run ",
-                                "docker build ",
-                                "docker push ",
-                                "docker pull ",
-                                "docker login ",
-                                "docker logout "
-                            ]):
-                                logger.debug(f"Repo {repo} necesita Docker-in-Docker")
-                                return True
-            return False
-        except Exception as e:
-            logger.debug(f"Error verificando Docker en workflow de {repo}: {e}")
-            return False
+                return False, False
+
+            workflow_urls = [
+                workflow["download_url"]
+                for workflow in json_loads(response.content)
+                if workflow.get("name", "").endswith(_WORKFLOW_SUFFIXES) and workflow.get("download_url")
+            ]
+            # Los archivos se descargan en paralelo y se evalúan en orden; al resolver
+            # ambos flags se cancelan las descargas pendientes
+            fetches = [_WORKFLOW_FETCH_POOL.submit(self._fetch_workflow_content, url) for url in workflow_urls]
+            try:
+                for fetch in fetches:
+                    content = fetch.result()
+                    if content is None:
+                        continue
+                    if not uses_self_hosted and _SELF_HOSTED_RE.search(content):
+                        logger.debug(f"Repo {repo} usa self-hosted runners")
+                        uses_self_hosted = True
+                    if not needs_dind and _DIND_RE.search(content):
+                        logger.debug(f"Repo {repo} necesita Docker-in-Docker")
+                        needs_dind = True
+                    if uses_self_hosted and needs_dind:
+                        break
+            finally:
+                for fetch in fetches:
+                    fetch.cancel()
+
+            return uses_self_hosted, needs_dind
+
+        except (requests.RequestException, ValueError, AttributeError) as e:
+            # Red, JSON inválido, repo sin "owner/name" o respuesta sin forma de listado
+            logger.debug(f"Error verificando workflows de {repo}: {e}")
+            return uses_self_hosted, needs_dind
+
+    def _fetch_workflow_content(self, url: str) -> Optional[str]:
+        """Descarga el contenido de un archivo de workflow (None si la respuesta no es 200)."""
+        response = requests.get(url, headers=self.token_generator.headers, timeout=30.0)
+        return response.text if response.status_code == 200 else None
+
+    def _count_workflow_runs(self, repo: str, status: str) -> int:
+        """Cuenta workflow runs por estado vía total_count (filtrado en servidor, una sola fila)."""
+        key = (repo, status)
+        now = time.monotonic()
+        with self._workflow_count_lock:
+            cached = self._workflow_count_cache.get(key)
+        if cached is not None and now < cached[0]:
+            return cached[1]
+
+        headers = self.token_generator.headers
+        if cached is not None and cached[2]:
+            # Petición condicional: un 304 no consume rate limit y llega sin cuerpo
+            headers = {**headers, "If-None-Match": cached[2]}
+        url = f"{self.token_generator.api_base}/repos/{repo}/actions/runs"
+        response = requests.get(url, headers=headers, params={"status": status, "per_page": 1}, timeout=30.0)
+        self.metrics.github_count_requests_total.inc()
+
+        if response.status_code == 304:
+            self.metrics.github_not_modified_total.inc()
+            count, etag = cached[1], cached[2]
+        elif response.status_code == 200:
+            count, etag = json_loads(response.content).get("total_count", 0), response.headers.get("ETag")
+        else:
+            count, etag = 0, None
+        with self._workflow_count_lock:
+            self._workflow_count_cache[key] = (now + _WORKFLOW_COUNT_TTL, count, etag)
+        return count
+
+    def _invalidate_workflow_counts(self, repo: str) -> None:
+        """Expira los conteos cacheados de un repo tras crear o destruir uno de sus runners (conserva el ETag)."""
+        with self._workflow_count_lock:
+            cache = self._workflow_count_cache
+            for key, entry in tuple(cache.items()):
+                if key[0] == repo:
+                    cache[key] = (0.0, entry[1], entry[2])
 
     def get_active_workflows_for_repo(self, repo: str) -> int:
         """Verifica workflows en ejecución para un repositorio."""
-        return len(self._github_api_call(f"repos/{repo}/actions/runs", {"status": "in_progress"}).get("workflow_runs", []))
+        return self._count_workflow_runs(repo, "in_progress")
 
     def get_queued_jobs_for_repo(self, repo: str) -> int:
         """Verifica jobs en cola para un repositorio."""
-        return len(self._github_api_call(f"repos/{repo}/actions/runs", {"status": "queued"}).get("workflow_runs", []))
+        return self._count_workflow_runs(repo, "queued")
@@ -3,23 +3,27 @@ Lógica principal del servicio Orchestrator.
 Contiene toda la lógica de negocio separada de la API FastAPI.
 """
 
+import asyncio
 import logging
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from src.api.models import (
     ConfigurationInfo, 
     RunnerRequest, 
     RunnerResponse, 
     RunnerStatus, 
-    ValidationResult
+    ValidationResult,
+    runner_status,
 )
 from src.core.lifecycle import LifecycleManager
 from src.services.config import ConfigValidator
 from src.utils.helpers import (
     ConfigurationError, 
     PlaceholderResolver,
+    RunnerNotFoundError,
     create_response, 
+    json_dumps,
     setup_logger,
     get_env_var,
     format_log
@@ -28,6 +32,12 @@ from src.utils.helpers import (
 # Configuración de logging centralizada
 logger = setup_logger(__name__)
 
+# Variables de entorno leídas explícitamente en _initialize_environment
+_CORE_CONFIG_VARS = frozenset(
+    ("GITHUB_RUNNER_TOKEN", "RUNNER_IMAGE", "AUTO_CREATE_RUNNERS", "RUNNER_CHECK_INTERVAL")
+)
+_CONFIG_VAR_PREFIXES = ("GITHUB_", "RUNNER_", "AUTO_")
+
 
 class OrchestratorService:
     """Servicio principal del orchestrator con toda la lógica de negocio."""
@@ -44,30 +54,18 @@ class OrchestratorService:
         try:
             logger.info(format_log('CONFIG', 'Configurando variables de entorno'))
             
-            # Contar variables configuradas
-            config_vars = []
-            
             self.github_runner_token = get_env_var("GITHUB_RUNNER_TOKEN", required=True)
-            config_vars.append("GITHUB_RUNNER_TOKEN: ***CONFIGURADO***")
-            
             self.runner_image = get_env_var("RUNNER_IMAGE", required=True)
-            config_vars.append(f"RUNNER_IMAGE: {self.runner_image}")
-            
             self.auto_create_runners = os.getenv("AUTO_CREATE_RUNNERS", "false").lower() == "true"
-            config_vars.append(f"AUTO_CREATE_RUNNERS: {self.auto_create_runners}")
-            
             self.runner_check_interval = int(os.getenv("RUNNER_CHECK_INTERVAL", "300"))
-            config_vars.append(f"RUNNER_CHECK_INTERVAL: {self.runner_check_interval}s")
+            self.runner_status_refresh_interval = float(os.getenv("RUNNER_STATUS_REFRESH_INTERVAL", "5"))
             
-            # Agregar otras variables relevantes
-            for key, value in os.environ.items():
-                if key.startswith(('GITHUB_', 'RUNNER_', 'AUTO_')) and key not in ['GITHUB_RUNNER_TOKEN', 'RUNNER_IMAGE', 'AUTO_CREATE_RUNNERS', 'RUNNER_CHECK_INTERVAL']:
-                    if 'TOKEN' in key:
-                        config_vars.append(f"{key}: ***CONFIGURADO***")
-                    else:
-                        config_vars.append(f"{key}: {value}")
-            
-            logger.info(format_log('CONFIG', f'{len(config_vars)} variables configuradas'))
+            # Contar variables configuradas (solo se reporta el total)
+            extra_vars = sum(
+                1 for key in os.environ
+                if key.startswith(_CONFIG_VAR_PREFIXES) and key not in _CORE_CONFIG_VARS
+            )
+            logger.info(format_log('CONFIG', f'{len(_CORE_CONFIG_VARS) + extra_vars} variables configuradas'))
             logger.info(format_log('SUCCESS', 'Variables de entorno inicializadas'))
             
         except Exception as e:
@@ -91,6 +89,20 @@ class OrchestratorService:
             self.placeholder_resolver = PlaceholderResolver()
             logger.info(format_log('SUCCESS', 'Placeholder Resolver inicializado'))
             
+            # Los placeholders son estáticos: la respuesta se serializa una sola vez
+            placeholders = self.placeholder_resolver.get_available_placeholders()
+            self.placeholders_response_body = json_dumps(create_response(
+                True,
+                "Placeholders obtenidos",
+                {"total_placeholders": len(placeholders), "placeholders": placeholders},
+            ))
+            
+            # La configuración de runners se carga una vez: el resumen se construye al primer uso
+            self._configuration_info: Optional[ConfigurationInfo] = None
+            
+            # (state_version, runners): listado servido a las consultas, refrescado en segundo plano
+            self._runners_snapshot: Tuple[int, List[RunnerStatus]] = (-1, [])
+            
             logger.info(format_log('SUCCESS', 'Todos los componentes inicializados'))
             
         except Exception as e:
@@ -136,19 +148,30 @@ class OrchestratorService:
     async def create_runners(self, request: RunnerRequest) -> List[RunnerResponse]:
         """Crea múltiples runners efímeros."""
         try:
+            # Generar registration tokens concurrentemente
+            tokens = await asyncio.gather(*(
+                self.lifecycle_manager.token_generator.generate_registration_token(
+                    request.scope, request.scope_name
+                )
+                for _ in range(request.count)
+            ))
+            
             runners = []
             for i in range(request.count):
                 runner_name = request.runner_name
                 if request.count > 1:
                     runner_name = f"{request.runner_name}-{i+1}" if request.runner_name else None
                 
-                runner_id = self.lifecycle_manager.create_runner(
+                # Creación bloqueante (Docker) fuera del event loop
+                runner_id = await asyncio.to_thread(
+                    self.lifecycle_manager.create_runner,
                     scope=request.scope,
                     scope_name=request.scope_name,
                     runner_name=runner_name,
                     runner_group=request.runner_group,
                     labels=request.labels,
                     enable_dind=request.enable_dind,
+                    registration_token=tokens[i],
                 )
                 
                 runners.append(
@@ -171,8 +194,8 @@ class OrchestratorService:
     async def get_runner_status(self, runner_id: str) -> RunnerStatus:
         """Obtiene el estado de un runner específico."""
         try:
-            status = self.lifecycle_manager.get_runner_status(runner_id)
-            return RunnerStatus(**status)
+            status = await asyncio.to_thread(self.lifecycle_manager.get_runner_status, runner_id)
+            return runner_status(status)
             
         except Exception as e:
             logger.error(f"Error obteniendo estado del runner {runner_id}: {e}")
@@ -181,10 +204,10 @@ class OrchestratorService:
     async def destroy_runner(self, runner_id: str) -> Dict:
         """Destruye un runner específico."""
         try:
-            success = self.lifecycle_manager.destroy_runner(runner_id)
+            success = await asyncio.to_thread(self.lifecycle_manager.destroy_runner, runner_id)
             
             if not success:
-                raise ValueError("Runner no encontrado o no se pudo destruir")
+                raise RunnerNotFoundError("Runner no encontrado o no se pudo destruir")
             
             return create_response(True, f"Runner {runner_id} destruido exitosamente")
             
@@ -195,19 +218,42 @@ class OrchestratorService:
             raise
     
     async def list_runners(self) -> List[RunnerStatus]:
-        """Lista todos los runners activos."""
+        """Lista todos los runners activos (desde el snapshot si sigue vigente)."""
         try:
-            runners = self.lifecycle_manager.list_active_runners()
-            return [RunnerStatus(**runner) for runner in runners]
+            state_version, runners = self._runners_snapshot
+            if state_version == self.lifecycle_manager.state_version:
+                return runners
+            # Hubo altas/bajas desde el último refresco: se lista bajo demanda
+            return await self.refresh_runners_snapshot()
             
         except Exception as e:
             logger.error(f"Error listando runners: {e}")
             raise
     
+    async def refresh_runners_snapshot(self) -> List[RunnerStatus]:
+        """Consulta Docker y publica un nuevo snapshot del listado de runners."""
+        # La versión se toma antes de listar: un cambio concurrente invalida el snapshot
+        state_version = self.lifecycle_manager.state_version
+        runners = await asyncio.to_thread(self.lifecycle_manager.list_active_runners)
+        statuses = [runner_status(runner) for runner in runners]
+        self._runners_snapshot = (state_version, statuses)
+        return statuses
+    
+    async def run_runners_refresh(self):
+        """Refresca periódicamente el snapshot de runners (cambios externos, p.ej. contenedores que terminan)."""
+        while True:
+            try:
+                await self.refresh_runners_snapshot()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(format_log('ERROR', 'Error refrescando listado de runners', str(e)))
+            await asyncio.sleep(self.runner_status_refresh_interval)
+    
     async def cleanup_runners(self) -> Dict:
         """Limpia runners inactivos."""
         try:
-            cleaned = self.lifecycle_manager.cleanup_inactive_runners()
+            cleaned = await asyncio.to_thread(self.lifecycle_manager.cleanup_inactive_runners)
             return create_response(True, f"Limpiados {cleaned} runners", {"cleaned_count": cleaned})
             
         except Exception as e:
@@ -216,24 +262,25 @@ class OrchestratorService:
     
     async def debug_runner_environment(self, runner_name: str) -> Dict:
         """Debug de variables de entorno de un runner."""
-        env_vars = self.lifecycle_manager.debug_runner_environment(runner_name)
+        env_vars = await asyncio.to_thread(self.lifecycle_manager.debug_runner_environment, runner_name)
         return create_response(True, "Environment variables obtenidas", env_vars)
     
     async def get_runner_detailed_info(self, runner_name: str) -> Dict:
         """Obtiene información detallada de un runner."""
-        info = self.lifecycle_manager.get_runner_detailed_info(runner_name)
+        info = await asyncio.to_thread(self.lifecycle_manager.get_runner_detailed_info, runner_name)
         return create_response(True, "Información detallada obtenida", info)
 
     async def get_runner_logs(self, runner_name: str) -> Dict:
         """Obtiene logs de un runner específico."""
         try:
             # Buscar contenedor por nombre
-            container = self.lifecycle_manager.container_manager.get_container_by_name(runner_name)
+            container_manager = self.lifecycle_manager.container_manager
+            container = await asyncio.to_thread(container_manager.get_container_by_name, runner_name)
             if not container:
-                raise ValueError("Runner no encontrado")
+                raise RunnerNotFoundError("Runner no encontrado")
             
             # Obtener logs
-            logs = self.lifecycle_manager.container_manager.get_container_logs(container, tail=200)
+            logs = await asyncio.to_thread(container_manager.get_container_logs, container, tail=200)
             
             return create_response(True, "Logs obtenidos", {"logs": logs})
             
@@ -248,9 +295,11 @@ class OrchestratorService:
     async def get_configuration_info(self) -> ConfigurationInfo:
         """Obtiene información de configuración."""
         try:
-            env_manager = self.lifecycle_manager.container_manager.environment_manager
-            config_summary = env_manager.get_configuration_summary()
-            return ConfigurationInfo(**config_summary)
+            if self._configuration_info is None:
+                env_manager = self.lifecycle_manager.container_manager.environment_manager
+                config_summary = env_manager.get_configuration_summary()
+                self._configuration_info = ConfigurationInfo(**config_summary)
+            return self._configuration_info
             
         except Exception as e:
             logger.error(f"Error obteniendo información de configuración: {e}")
@@ -290,6 +339,10 @@ class OrchestratorService:
     
     # ===== MÉTODOS DE HEALTH CHECK =====
     
+    def health_etag(self) -> str:
+        """ETag del health check: cambia solo cuando cambia el estado reportado."""
+        return f'"{self.lifecycle_manager.state_version}-{int(self.lifecycle_manager.monitoring)}"'
+    
     async def health_check(self) -> Dict:
         """Health check básico del servicio."""
         return create_response(
@@ -312,6 +365,13 @@ class OrchestratorService:
             if active_count > 100:
                 raise ValueError(f"Demasiados runners activos: {active_count}")
             
+            # El cliente Docker se abre de forma diferida: sin ping el servicio se
+            # reportaría saludable aunque el socket no esté disponible
+            try:
+                await asyncio.to_thread(self.lifecycle_manager.container_manager.ping)
+            except Exception as e:
+                raise ValueError(str(e)) from e
+            
             return create_response(
                 True,
                 "Servicio saludable",
@@ -328,8 +388,26 @@ class OrchestratorService:
             logger.error(f"Error en health check: {e}")
             raise
     
+    def get_monitoring_status(self) -> Dict:
+        """Estado del monitoreo leído del registro de métricas (sin tocar Docker ni locks)."""
+        status = self.lifecycle_manager.metrics.snapshot()
+        # Distribución por repo desde el índice: O(repos), sin recorrer los runners
+        status["runners_by_repo"] = {
+            repo: len(runner_ids)
+            for repo, runner_ids in self.lifecycle_manager.runners_by_repo.items()
+        }
+        return status
+    
+    def get_prometheus_metrics(self) -> bytes:
+        """Métricas en formato de texto Prometheus."""
+        return self.lifecycle_manager.metrics.render_prometheus()
+    
     def stop_monitoring(self):
         """Detiene el monitoreo automático."""
         if hasattr(self.lifecycle_manager, 'stop_monitoring'):
             self.lifecycle_manager.stop_monitoring()
             logger.info("Monitoreo detenido")
+    
+    async def close(self):
+        """Libera los clientes HTTP compartidos."""
+        await self.lifecycle_manager.token_generator.close()
@@ -3,10 +3,26 @@ import os
 import re
 from typing import Any, Dict, List, Optional
 
-from src.utils.helpers import format_log, setup_logger
+from src.utils.helpers import (
+    RUNNER_ENV_PREFIX,
+    PlaceholderResolver,
+    format_log,
+    get_runner_env_vars,
+    setup_logger,
+)
 
 logger = setup_logger(__name__)
 
+# Valores aceptados en validaciones de variables opcionales
+_BOOLEAN_VALUES = frozenset(("true", "false"))
+_PORT_VARS = frozenset(("API_GATEWAY_PORT", "ORCHESTRATOR_PORT"))
+
+# Tokens personales empiezan con ghp_; de integración con gho_, ghu_, ghs_
+_GH_TOKEN_RE = re.compile(r"^gh[pouhs]_[A-Za-z0-9_]{36,255}$")
+_PLACEHOLDER_RE = re.compile(r"\{[^}]+\}")
+# Mismo conjunto que resuelve PlaceholderResolver (una única fuente de verdad)
+_VALID_PLACEHOLDERS = PlaceholderResolver.AVAILABLE_KEYS
+
 
 class ConfigValidator:
     """
@@ -25,13 +41,19 @@ class ConfigValidator:
 
         # Sin hardcodeo - cualquier imagen es soportada vía runnerenv_
 
+        # El entorno del proceso no cambia tras el arranque: se valida una sola vez
+        self._environment_validation: Optional[Dict[str, Any]] = None
+
     def validate_environment(self) -> Dict[str, Any]:
         """
         Valida todas las variables de entorno del sistema.
 
         Returns:
-            Diccionario con resultado de validación
+            Diccionario con resultado de validación (calculado en la primera llamada)
         """
+        if self._environment_validation is not None:
+            return self._environment_validation
+
         results = {
             "valid": True,
             "errors": [],
@@ -76,11 +98,11 @@ class ConfigValidator:
                         results["valid"] = False
 
                 elif var == "AUTO_CREATE_RUNNERS":
-                    if value.lower() not in ["true", "false"]:
+                    if value.lower() not in _BOOLEAN_VALUES:
                         results["invalid_optional"].append(f"{var}: debe ser true/false")
                         results["valid"] = False
 
-                elif var in ["API_GATEWAY_PORT", "ORCHESTRATOR_PORT"]:
+                elif var in _PORT_VARS:
                     try:
                         port = int(value)
                         if not (1 <= port <= 65535):
@@ -107,6 +129,7 @@ class ConfigValidator:
         if results["invalid_optional"]:
             results["errors"].append(f"Variables inválidas: {results['invalid_optional']}")
 
+        self._environment_validation = results
         return results
 
     def _validate_github_token(self, token: str) -> bool:
@@ -119,10 +142,7 @@ class ConfigValidator:
         Returns:
             True si tiene formato válido
         """
-        # Tokens personales empiezan con ghp_
-        # Tokens de integración empiezan con gho_, ghu_, ghs_
-        pattern = r"^gh[pouhs]_[A-Za-z0-9_]{36,255}$"
-        return bool(re.match(pattern, token))
+        return _GH_TOKEN_RE.match(token) is not None
 
     def _validate_runner_image(self, image: str) -> bool:
         """
@@ -154,11 +174,7 @@ class ConfigValidator:
         }
 
         # Encontrar todas las variables runnerenv_
-        runner_env_vars = {}
-        for key, value in os.environ.items():
-            if key.startswith("runnerenv_"):
-                env_key = key[11:]  # Remover prefijo
-                runner_env_vars[env_key] = value
+        runner_env_vars = get_runner_env_vars()
 
         results["variables_found"] = len(runner_env_vars)
 
@@ -167,10 +183,8 @@ class ConfigValidator:
             return results
 
         # Validar placeholders en cada variable
-        placeholder_pattern = r"\{[^}]+\}"
-
         for env_key, env_value in runner_env_vars.items():
-            placeholders = re.findall(placeholder_pattern, env_value)
+            placeholders = _PLACEHOLDER_RE.findall(env_value)
 
             for placeholder in placeholders:
                 if not self._is_valid_placeholder(placeholder):
@@ -194,32 +208,7 @@ class ConfigValidator:
         Returns:
             True si es válido
         """
-        valid_placeholders = {
-            # Básicas
-            "{scope_name}",
-            "{runner_name}",
-            "{registration_token}",
-            # Tiempo
-            "{timestamp}",
-            "{timestamp_iso}",
-            "{timestamp_date}",
-            "{timestamp_time}",
-            # Sistema
-            "{hostname}",
-            "{orchestrator_id}",
-            "{docker_network}",
-            # Entorno
-            "{orchestrator_port}",
-            "{api_gateway_port}",
-            "{runner_image}",
-            "{registry_url}",
-            # GitHub API
-            "{repo_owner}",
-            "{repo_name}",
-            "{repo_full_name}",
-            "{user_login}",
-        }
-        return placeholder in valid_placeholders
+        return placeholder in _VALID_PLACEHOLDERS
 
     def get_validation_summary(self) -> Dict[str, Any]:
         """
@@ -255,8 +244,8 @@ class ConfigValidator:
                 recommendations.append(f"Configurar variable obligatoria: {var}")
 
         # Verificar variables de runners
-        runner_vars_count = len([k for k in os.environ.keys() if k.startswith("runnerenv_")])
-        if runner_vars_count == 0:
+        # Solo importa si existe alguna: any() corta en la primera coincidencia
+        if not any(key.startswith(RUNNER_ENV_PREFIX) for key in os.environ):
             recommendations.append(
                 "Considerar configurar variables runnerenv_* para mayor flexibilidad"
             )
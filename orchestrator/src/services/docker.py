@@ -4,14 +4,31 @@ Centraliza operaciones comunes con contenedores.
 """
 
 import logging
+import re
 import time
+from datetime import datetime, timezone
+from types import MappingProxyType
 from typing import Any, Dict, List, Optional
 
-import docker
-from src.utils.helpers import DockerError, ErrorHandler, setup_logger
+from src.utils.helpers import DockerError, setup_logger
 
 logger = setup_logger(__name__)
 
+# Caracteres no permitidos en nombres de contenedor
+_CONTAINER_NAME_RE = re.compile(r"[^a-zA-Z0-9_-]")
+
+# Default compartido (inmutable) para secciones ausentes de container.attrs
+_EMPTY_MAPPING = MappingProxyType({})
+
+# Estados Docker de los que un contenedor no vuelve a "running"
+_TERMINAL_STATES = frozenset(("exited", "dead"))
+
+# Inspects del mismo objeto contenedor dentro de esta ventana se comparten
+_RELOAD_MAX_AGE = 0.5
+
+# Primer intervalo de sondeo en wait_for_container (se duplica hasta check_interval)
+_WAIT_INITIAL_DELAY = 0.05
+
 
 class DockerUtils:
     """Utilitarios centralizados para operaciones Docker."""
@@ -21,6 +38,21 @@ class DockerUtils:
         """Formatea ID de contenedor a 12 caracteres."""
         return container_id[:12] if container_id else "unknown"
 
+    @staticmethod
+    def refresh(container: Any) -> None:
+        """
+        Recarga los attrs de un contenedor salvo que este mismo objeto se haya
+        recargado hace menos de _RELOAD_MAX_AGE segundos.
+
+        Args:
+            container: Contenedor Docker
+        """
+        now = time.monotonic()
+        if now - getattr(container, "_refreshed_at", float("-inf")) < _RELOAD_MAX_AGE:
+            return
+        container.reload()
+        container._refreshed_at = now
+
     @staticmethod
     def get_container_info(container: Any) -> Dict[str, Any]:
         """
@@ -33,25 +65,52 @@ class DockerUtils:
             Diccionario con información del contenedor
         """
         try:
-            container.reload()  # Actualizar estado
+            DockerUtils.refresh(container)  # Actualizar estado
 
+            # attrs/NetworkSettings se resuelven una sola vez por contenedor
+            attrs = container.attrs
+            network_settings = attrs.get("NetworkSettings") or _EMPTY_MAPPING
+            tags = container.image.tags
             return {
-                "id": self.format_container_id(container.id),
+                "id": DockerUtils.format_container_id(container.id),
                 "name": container.name,
                 "status": container.status,
-                "image": container.image.tags[0] if container.image.tags else "unknown",
-                "created": container.attrs["Created"],
+                "image": tags[0] if tags else "unknown",
+                "created": attrs["Created"],
                 "labels": container.labels,
                 "ports": container.ports,
-                "mounts": container.attrs.get("Mounts", []),
-                "networks": container.attrs.get("NetworkSettings", {}).get("Networks", {}),
-                "ip_address": container.attrs.get("NetworkSettings", {}).get("IPAddress", ""),
-                "state": container.attrs.get("State", {}),
+                "mounts": attrs.get("Mounts", []),
+                "networks": network_settings.get("Networks", {}),
+                "ip_address": network_settings.get("IPAddress", ""),
+                "state": attrs.get("State", {}),
             }
         except Exception as e:
-            container_id = self.format_container_id(container.id)
+            container_id = DockerUtils.format_container_id(container.id)
             logger.error(f"Error obteniendo información del contenedor {container_id}: {e}")
-            return {"id": self.format_container_id(container.id), "status": "error", "error": str(e)}
+            return {"id": container_id, "status": "error", "error": str(e)}
+
+    @staticmethod
+    def get_container_summary(container: Any) -> Dict[str, Any]:
+        """
+        Obtiene el resumen de un contenedor obtenido con containers.list(sparse=True).
+
+        Args:
+            container: Contenedor Docker con attrs del listado (sin inspect)
+
+        Returns:
+            Diccionario con id, status, image, created y labels
+        """
+        attrs = container.attrs
+        created = attrs.get("Created")
+        if isinstance(created, (int, float)):
+            created = datetime.fromtimestamp(created, timezone.utc).isoformat().replace("+00:00", "Z")
+        return {
+            "id": DockerUtils.format_container_id(attrs.get("Id", "")),
+            "status": attrs.get("State", "unknown"),
+            "image": attrs.get("Image", "unknown"),
+            "created": created,
+            "labels": attrs.get("Labels") or {},
+        }
 
     @staticmethod
     def is_container_running(container: Any) -> bool:
@@ -65,7 +124,7 @@ class DockerUtils:
             True si está corriendo, False en caso contrario
         """
         try:
-            container.reload()
+            DockerUtils.refresh(container)
             return container.status.lower() == "running"
         except Exception:
             return False
@@ -79,15 +138,31 @@ class DockerUtils:
             container: Contenedor Docker
 
         Returns:
-            Diccionario con labels
+            Diccionario con labels (siempre un dict; vacío si no hay o falla)
         """
         try:
-            container.reload()
+            DockerUtils.refresh(container)
             labels = container.labels
             return labels if isinstance(labels, dict) else {}
         except Exception:
             return {}
 
+    @staticmethod
+    def get_cached_labels(container: Any) -> Dict[str, str]:
+        """
+        Obtiene labels desde los attrs ya cargados, sin consultar al daemon.
+
+        Args:
+            container: Contenedor Docker (puede estar ya eliminado)
+
+        Returns:
+            Diccionario con labels (vacío si no hay)
+        """
+        attrs = container.attrs
+        config = attrs.get("Config") or _EMPTY_MAPPING
+        # Contenedores de un listado sparse traen los labels en el nivel superior
+        return config.get("Labels") or attrs.get("Labels") or {}
+
     @staticmethod
     def get_container_environment(container: Any) -> Dict[str, str]:
         """
@@ -100,7 +175,7 @@ class DockerUtils:
             Diccionario con variables de entorno
         """
         try:
-            container.reload()
+            DockerUtils.refresh(container)
             return container.attrs.get("Config", {}).get("Env", [])
         except Exception:
             return {}
@@ -117,10 +192,8 @@ class DockerUtils:
         Returns:
             Nombre formateado
         """
-        import re
-
         # Limpiar nombre
-        clean_name = re.sub(r"[^a-zA-Z0-9_-]", "", name)
+        clean_name = _CONTAINER_NAME_RE.sub("", name)
 
         if not clean_name:
             clean_name = "unnamed"
@@ -146,19 +219,16 @@ class DockerUtils:
         Returns:
             Diccionario con labels
         """
-        labels = {
+        # Un solo literal (incluye los adicionales): sin update ni redimensionado posterior
+        return {
             "gha-ephemeral": "true",
             "runner-name": runner_name,
             "scope": scope,
             "scope_name": scope_name,
             "repo": scope_name,
+            **(additional_labels or _EMPTY_MAPPING),
         }
 
-        if additional_labels:
-            labels.update(additional_labels)
-
-        return labels
-
     @staticmethod
     def validate_container_name(name: str) -> str:
         """
@@ -173,13 +243,11 @@ class DockerUtils:
         Raises:
             ValueError: Si el nombre es inválido
         """
-        import re
-
         if not name:
             raise ValueError("El nombre del contenedor no puede estar vacío")
 
         # Limpiar caracteres inválidos
-        clean_name = re.sub(r"[^a-zA-Z0-9_-]", "", name)
+        clean_name = _CONTAINER_NAME_RE.sub("", name)
 
         if not clean_name:
             raise ValueError("El nombre contiene caracteres inválidos")
@@ -200,22 +268,26 @@ class DockerUtils:
         Args:
             container: Contenedor Docker
             timeout: Tiempo máximo de espera
-            check_interval: Intervalo de verificación
+            check_interval: Intervalo máximo entre verificaciones (backoff exponencial desde 50 ms)
 
         Returns:
             True si el contenedor está listo, False si timeout
         """
-        start_time = time.time()
+        # Reloj monótono: inmune a ajustes del reloj de pared y sin resta por iteración
+        deadline = time.monotonic() + timeout
+        delay = _WAIT_INITIAL_DELAY
 
-        while time.time() - start_time < timeout:
+        while time.monotonic() < deadline:
             try:
                 container.reload()
-                if container.status.lower() == "running":
+                status = container.status.lower()
+                if status == "running":
                     return True
-                elif container.status.lower() in ["exited", "dead"]:
+                elif status in _TERMINAL_STATES:
                     return False
-                time.sleep(check_interval)
             except Exception:
-                time.sleep(check_interval)
+                pass
+            time.sleep(delay)
+            delay = min(delay * 2, check_interval)
 
         return False
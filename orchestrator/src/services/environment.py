@@ -1,12 +1,16 @@
 import logging
-import os
 from typing import Any, Dict, List, Optional
 
-from src.utils.helpers import PlaceholderResolver, setup_logger
+from src.utils.helpers import PlaceholderResolver, get_runner_env_vars, setup_logger
 
 logger = setup_logger(__name__)
 
 
+def _mask_token(value: str, token: str) -> str:
+    """Oculta el registration token dentro de un valor antes de registrarlo."""
+    return value.replace(token, "***") if token and token in value else value
+
+
 class EnvironmentManager:
     """
     Gestiona variables de entorno para runners con soporte para placeholders.
@@ -15,6 +19,8 @@ class EnvironmentManager:
     Soporta múltiples configuraciones según la imagen del runner.
     """
 
+    __slots__ = ("runner_image", "placeholder_resolver", "_cached_config")
+
     def __init__(self, runner_image: str):
         self.runner_image = runner_image
         self.placeholder_resolver = PlaceholderResolver()
@@ -31,15 +37,9 @@ class EnvironmentManager:
         if self._cached_config is not None:
             return self._cached_config
 
-        runner_env = {}
-
         # Cargar todas las variables con prefijo runnerenv_ del entorno del contenedor
-        for key, value in os.environ.items():
-            if key.startswith("runnerenv_"):
-                # Remover prefijo "runnerenv_"
-                env_key = key.replace("runnerenv_", "", 1)  # Reemplazar solo la primera ocurrencia
-                runner_env[env_key] = value
-                logger.debug(f"Variable runnerenv encontrada: {env_key}")
+        runner_env = get_runner_env_vars()
+        logger.debug("Variables runnerenv encontradas: %s", list(runner_env))
 
         self._cached_config = runner_env
         logger.info(f"Cargadas {len(runner_env)} variables de entorno para runners")
@@ -85,26 +85,38 @@ class EnvironmentManager:
                 "registration_token": registration_token,
             }
 
-            # Procesar cada variable
+            # Procesar cada variable (el formateo de logs solo si el nivel está habilitado)
+            log_debug = logger.isEnabledFor(logging.DEBUG)
+            resolve = self.placeholder_resolver.resolve_placeholders
             processed_env = {}
             for key, value in raw_env.items():
-                resolved_value = self.placeholder_resolver.resolve_placeholders(value, context)
+                resolved_value = resolve(value, context)
                 processed_env[key] = resolved_value
 
                 # Log de resolución para debugging
-                if value != resolved_value:
-                    logger.debug(f"Variable {key}: '{value}' -> '{resolved_value}'")
-
-                # Log específico para REPO_URL
-                if key == "REPO_URL":
-                    logger.info(f"REPO_URL resuelto: '{resolved_value}'")
-                    if not resolved_value or resolved_value == "https://github.com/":
-                        logger.error(f"REPO_URL inválido: '{resolved_value}'")
-
-                # Log de todas las variables procesadas para debugging
-                logger.info(f"Variable procesada - {key}: '{resolved_value}'")
-
-            logger.info(f"Procesadas {len(processed_env)} variables de entorno")
+                if log_debug and value != resolved_value:
+                    logger.debug(
+                        "Variable %s: '%s' -> '%s'",
+                        key, value, _mask_token(resolved_value, registration_token),
+                    )
+
+            # Log específico para REPO_URL
+            if "REPO_URL" in processed_env:
+                repo_url = processed_env["REPO_URL"]
+                logger.info("REPO_URL resuelto: '%s'", repo_url)
+                if not repo_url or repo_url == "https://github.com/":
+                    logger.error("REPO_URL inválido: '%s'", repo_url)
+
+            # Todas las variables procesadas en un único registro (token enmascarado)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Procesadas %d variables de entorno:\n%s",
+                    len(processed_env),
+                    "\n".join(
+                        f"  {key}: '{_mask_token(value, registration_token)}'"
+                        for key, value in processed_env.items()
+                    ),
+                )
             return processed_env
 
         except Exception as e:
@@ -239,7 +251,7 @@ class EnvironmentManager:
             "total_variables": len(raw_env),
             "variable_names": list(raw_env.keys()),
             "has_configuration": len(raw_env) > 0,
-            "available_placeholders": len(self.placeholder_resolver.get_available_placeholders()),
+            "available_placeholders": len(PlaceholderResolver.AVAILABLE_KEYS),
             "orchestrator_id": self.placeholder_resolver.orchestrator_id,
         }
 
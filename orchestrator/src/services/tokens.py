@@ -1,13 +1,15 @@
 import logging
 from typing import Optional
 
-import requests
-from src.utils.helpers import setup_logger
+import httpx
+from src.utils.helpers import json_loads, setup_logger
 
 logger = setup_logger(__name__)
 
 
 class TokenGenerator:
+    __slots__ = ("github_runner_token", "api_base", "timeout", "headers", "client", "sync_client")
+
     def __init__(self, github_runner_token: str):
         self.github_runner_token = github_runner_token
         self.api_base = "https://api.github.com"
@@ -16,13 +18,42 @@ class TokenGenerator:
             "Authorization": f"token {github_runner_token}",
             "Accept": "application/vnd.github.v3+json",
         }
+        limits = httpx.Limits(max_keepalive_connections=8, max_connections=16)
+        timeout = httpx.Timeout(self.timeout, connect=5.0)
+        # Cliente async compartido para generar tokens concurrentemente
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=timeout,
+            transport=httpx.AsyncHTTPTransport(retries=2, limits=limits),
+        )
+        # Cliente sync para llamadores legacy (hilo de monitoreo)
+        self.sync_client = httpx.Client(
+            headers=self.headers,
+            timeout=timeout,
+            transport=httpx.HTTPTransport(retries=2, limits=limits),
+        )
 
-    def generate_registration_token(self, scope: str, scope_name: str) -> str:
+    async def generate_registration_token(self, scope: str, scope_name: str) -> str:
         """Genera un registration token para GitHub Actions runner."""
+        response = await self.client.post(self._get_token_url(scope, scope_name))
+        response.raise_for_status()
+        return json_loads(response.content).get("token", "")
+
+    def generate_registration_token_sync(self, scope: str, scope_name: str) -> str:
+        """Versión síncrona de generate_registration_token para llamadores legacy."""
+        response = self.sync_client.post(self._get_token_url(scope, scope_name))
+        response.raise_for_status()
+        return json_loads(response.content).get("token", "")
+
+    async def close(self) -> None:
+        """Cierra los clientes HTTP compartidos."""
+        await self.client.aclose()
+        self.sync_client.close()
+
+    def _get_token_url(self, scope: str, scope_name: str) -> str:
+        """Construye la URL del endpoint de registration token."""
         endpoint = f"{self._get_endpoint(scope, scope_name)}/actions/runners/registration-token"
-        url = f"{self.api_base}/{endpoint}"
-        response = requests.post(url, headers=self.headers, timeout=self.timeout)
-        return response.json().get("token", "")
+        return f"{self.api_base}/{endpoint}"
 
     def _get_endpoint(self, scope: str, scope_name: str) -> str:
         """Obtiene endpoint según scope."""
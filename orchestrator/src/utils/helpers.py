@@ -3,19 +3,55 @@ Utilitarios consolidados para el orchestrator.
 Contiene funciones de configuración, manejo de errores y resolución de placeholders.
 """
 
+import atexit
 import datetime
 import logging
 import os
 import re
 import socket
-import time
-from typing import Any, Dict, Optional
+import threading
+from enum import Enum
+from functools import lru_cache, partial
+from logging.handlers import MemoryHandler
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from fastapi import HTTPException as _HTTPException
+except ImportError:  # fastapi solo está disponible dentro del contenedor
+    _HTTPException = None
+
+
+def _json_default(obj: Any) -> Any:
+    """Serializa tipos sin soporte nativo (Enum, set/frozenset)."""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+try:
+    import orjson
+    from orjson import loads as json_loads
+
+    # Opciones fijadas una sola vez para todas las respuestas
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_json_default, option=_ORJSON_OPTIONS)
+except ImportError:  # orjson es opcional; fallback a la librería estándar
+    import json
+    from json import loads as json_loads
+
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, default=_json_default).encode("utf-8")
 
 
 # ===== CONFIGURACIÓN Y LOGGING =====
 
 # Constantes de formato para logging estandarizado
-LOG_CATEGORIES = {
+LOG_CATEGORIES = MappingProxyType({
     'START': '🚀 INICIO',
     'CONFIG': '⚙️ CONFIG', 
     'MONITOR': '🔄 MONITOREO',
@@ -23,24 +59,60 @@ LOG_CATEGORIES = {
     'ERROR': '❌ ERROR',
     'WARNING': '⚠️ ADVERTENCIA',
     'INFO': '📋 INFO'
-}
+})
+
+# Prefijos precalculados (con espacio final) por categoría
+_LOG_PREFIX = {k: f"{v} " for k, v in LOG_CATEGORIES.items()}
+_DEFAULT_PREFIX = "📋 INFO "
 
 def format_log(category: str, action: str, detail: str = "") -> str:
     """Formatea mensaje de log consistente."""
-    prefix = LOG_CATEGORIES.get(category, '📋 INFO')
+    prefix = _LOG_PREFIX.get(category, _DEFAULT_PREFIX)
     if detail:
-        return f"{prefix} {action}: {detail}"
-    return f"{prefix} {action}"
+        return f"{prefix}{action}: {detail}"
+    return f"{prefix}{action}"
 
 def setup_logger(name: str) -> logging.Logger:
     """Configura y retorna un logger estandarizado."""
     return logging.getLogger(name)
 
 
-def setup_logging_config():
-    """Configura el logging básico para toda la aplicación."""
-    import os
+# Librerías externas cuya verbosidad se reduce fuera de modo verbose
+_NOISY_LOGGERS = (
+    ("uvicorn.access", logging.WARNING),
+    ("uvicorn.error", logging.ERROR),
+    ("httpx", logging.WARNING),
+    ("docker", logging.WARNING),
+    ("requests", logging.WARNING),
+)
+
+# Buffer de logs: registros acumulados antes de escribir y periodo máximo de espera
+_LOG_BUFFER_CAPACITY = 256
+_LOG_FLUSH_INTERVAL = 0.05
+
+
+class _PeriodicMemoryHandler(MemoryHandler):
+    """MemoryHandler que además vacía el buffer periódicamente en segundo plano."""
     
+    def __init__(self, capacity: int, flush_interval: float, **kwargs):
+        super().__init__(capacity, **kwargs)
+        self._flush_interval = flush_interval
+        self._stop_event = threading.Event()
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flush_thread.start()
+    
+    def _flush_loop(self):
+        while not self._stop_event.wait(self._flush_interval):
+            self.flush()
+    
+    def close(self):
+        self._stop_event.set()
+        super().close()
+
+
+@lru_cache(maxsize=1)
+def setup_logging_config():
+    """Configura el logging básico para toda la aplicación (solo una vez; llamadas repetidas son un cache hit)."""
     # Obtener nivel de logging desde variable de entorno
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
     log_verbose = os.getenv("LOG_VERBOSE", "false").lower() == "true"
@@ -68,19 +140,26 @@ def setup_logging_config():
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
     
+    # Agrupar escrituras: vacía al llenar el buffer, ante WARNING+ o cada 50 ms
+    buffered_handler = _PeriodicMemoryHandler(
+        _LOG_BUFFER_CAPACITY,
+        _LOG_FLUSH_INTERVAL,
+        flushLevel=logging.WARNING,
+        target=console_handler,
+        flushOnClose=True,
+    )
+    atexit.register(buffered_handler.flush)
+    
     # Configurar root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, log_level))
     root_logger.handlers.clear()  # Limpiar handlers existentes
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(buffered_handler)
     
     # Reducir verbosidad de librerías externas
     if not log_verbose:
-        logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
-        logging.getLogger("uvicorn.error").setLevel(logging.ERROR)
-        logging.getLogger("httpx").setLevel(logging.WARNING)
-        logging.getLogger("docker").setLevel(logging.WARNING)
-        logging.getLogger("requests").setLevel(logging.WARNING)
+        for name, level in _NOISY_LOGGERS:
+            logging.getLogger(name).setLevel(level)
     
     # Asegurar que nuestros loggers usen el mismo nivel
     logging.getLogger("src").setLevel(getattr(logging, log_level))
@@ -91,23 +170,65 @@ def setup_logging_config():
         print(f"🔧 Logging configurado: nivel={log_level}, verbose={log_verbose}")
 
 
+@lru_cache(maxsize=None)
+def _cached_env(key: str, default: Optional[str]) -> Optional[str]:
+    """Lee una variable de entorno una sola vez (usar cache_clear en tests)."""
+    return os.environ.get(key, default)
+
+
 def get_env_var(key: str, default: str = None, required: bool = False) -> str:
     """Obtiene variable de entorno con validación."""
-    value = os.getenv(key, default)
+    value = _cached_env(key, default)
     if required and not value:
         raise RuntimeError(f"{key} es obligatorio")
     return value
 
 
+def get_env_int(key: str, default: int, minimum: Optional[int] = None) -> int:
+    """Obtiene variable de entorno entera; un valor inválido usa el default con un warning."""
+    raw = get_env_var(key)
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        logging.getLogger(__name__).warning(
+            format_log('WARNING', f'{key} inválido', f'{raw!r} no es un entero, usando {default}')
+        )
+        return default
+    return value if minimum is None else max(minimum, value)
+
+
+# Prefijo de las variables que se inyectan en los contenedores de runners
+RUNNER_ENV_PREFIX = "runnerenv_"
+_RUNNER_ENV_PREFIX_LEN = len(RUNNER_ENV_PREFIX)
+
+
+def get_runner_env_vars() -> Dict[str, str]:
+    """Variables runnerenv_* del entorno, sin el prefijo (una sola pasada sobre os.environ)."""
+    return {
+        key[_RUNNER_ENV_PREFIX_LEN:]: value
+        for key, value in os.environ.items()
+        if key.startswith(RUNNER_ENV_PREFIX)
+    }
+
+
 # ===== UTILIDADES DE CONTENEDORES =====
 
+# Caracteres no permitidos en nombres de runner
+_RUNNER_NAME_RE = re.compile(r"[^a-zA-Z0-9_-]")
+
 def validate_runner_name(runner_name: str) -> str:
     """Valida y normaliza nombre de runner."""
     if not runner_name:
         raise ValueError("runner_name no puede estar vacío")
     
+    # Camino rápido: nombre ya válido, sin pasar por el regex
+    if runner_name.isascii() and runner_name.replace("_", "").replace("-", "").isalnum():
+        return runner_name
+    
     # Eliminar caracteres inválidos
-    clean_name = re.sub(r"[^a-zA-Z0-9_-]", "", runner_name)
+    clean_name = _RUNNER_NAME_RE.sub("", runner_name)
     
     if not clean_name:
         raise ValueError("runner_name contiene caracteres inválidos")
@@ -131,27 +252,54 @@ def create_response(success: bool, message: str, data: Any = None) -> Dict[str,
 
 class OrchestratorError(Exception):
     """Error base del orchestrator."""
-    pass
 
 
 class ValidationError(OrchestratorError):
     """Error de validación."""
-    pass
 
 
 class DockerError(OrchestratorError):
     """Error relacionado con Docker."""
-    pass
 
 
 class GitHubError(OrchestratorError):
     """Error relacionado con GitHub API."""
-    pass
 
 
 class ConfigurationError(OrchestratorError):
     """Error de configuración."""
-    pass
+
+
+class RunnerNotFoundError(ValueError):
+    """Runner inexistente (ValueError para compatibilidad con los manejadores existentes)."""
+
+
+# Mapeo tipo de excepción -> (status HTTP, plantilla de detalle).
+# El orden importa para el fallback por subclase.
+_ERROR_MAP = {
+    RunnerNotFoundError: (404, "{}"),
+    ValidationError: (400, "Error de validación: {}"),
+    DockerError: (500, "{}"),
+    GitHubError: (502, "Error de GitHub API: {}"),
+    ConfigurationError: (500, "Error de configuración: {}"),
+    ValueError: (400, "Error en datos: {}"),
+    KeyError: (400, "Error en datos: {}"),
+    ConnectionError: (503, "Error de conexión"),
+}
+
+_INTERNAL_ERROR = (500, "Error interno del servidor")
+
+
+@lru_cache(maxsize=128)
+def _error_entry(error_type: type) -> Tuple[int, str]:
+    """Resuelve (status, template) por tipo de excepción, incluyendo subclases."""
+    entry = _ERROR_MAP.get(error_type)
+    if entry is not None:
+        return entry
+    for exc_type, candidate in _ERROR_MAP.items():
+        if issubclass(error_type, exc_type):
+            return candidate
+    return _INTERNAL_ERROR
 
 
 class ErrorHandler:
@@ -166,44 +314,70 @@ class ErrorHandler:
         error_msg = str(error)
         
         # Logging detallado
-        logger.error(f"Error en {operation}: {error_type} - {error_msg}")
-        if context:
-            logger.error(f"Contexto: {context}")
+        logger.error("Error en %s: %s - %s", operation, error_type, error_msg)
+        if context and logger.isEnabledFor(logging.ERROR):
+            logger.error("Contexto: %r", context)
         
         return ErrorHandler.handle_http_exception(error)
 
     @staticmethod
     def handle_http_exception(error: Exception) -> Any:
         """Convierte excepciones a HTTPException de FastAPI - solo en contenedor."""
-        from fastapi import HTTPException
-        
-        if isinstance(error, ValidationError):
-            return HTTPException(status_code=400, detail=f"Error de validación: {error}")
-        
-        elif isinstance(error, DockerError):
-            return HTTPException(status_code=500, detail=str(error))
-        
-        elif isinstance(error, GitHubError):
-            return HTTPException(status_code=502, detail=f"Error de GitHub API: {error}")
+        assert _HTTPException is not None, "fastapi no está instalado"
         
-        elif isinstance(error, ConfigurationError):
-            return HTTPException(status_code=500, detail=f"Error de configuración: {error}")
-        
-        elif isinstance(error, (ValueError, KeyError)):
-            return HTTPException(status_code=400, detail=f"Error en datos: {error}")
-        
-        elif isinstance(error, ConnectionError):
-            return HTTPException(status_code=503, detail="Error de conexión")
-        
-        else:
-            return HTTPException(status_code=500, detail="Error interno del servidor")
+        status_code, template = _error_entry(type(error))
+        return _HTTPException(status_code=status_code, detail=template.format(error))
 
 
 # ===== RESOLUCIÓN DE PLACEHOLDERS =====
 
+# Reloj UTC tz-aware (reemplaza datetime.utcnow, deprecado en 3.12)
+_utcnow = partial(datetime.datetime.now, datetime.timezone.utc)
+
+# Placeholders soportados con su descripción
+_AVAILABLE_PLACEHOLDERS = MappingProxyType({
+    # Básicas
+    "{scope_name}": "Nombre del repositorio/organización (ej: eliaspizarro/hello-ci)",
+    "{runner_name}": "Nombre único del runner (ej: ephemeral-runner-abc123)",
+    "{registration_token}": "Token efímero de registro",
+    # Tiempo
+    "{timestamp}": "Timestamp Unix actual",
+    "{timestamp_iso}": "Timestamp ISO 8601 (ej: 2024-02-03T18:30:34Z)",
+    "{timestamp_date}": "Fecha actual YYYY-MM-DD (ej: 2024-02-03)",
+    "{timestamp_time}": "Hora actual HH-MM-SS (ej: 18-30-34)",
+    # Sistema
+    "{hostname}": "Hostname del sistema (ej: docker2)",
+    "{orchestrator_id}": "ID único del orchestrator",
+    "{docker_network}": "Red Docker usada",
+    # Entorno
+    "{orchestrator_port}": "Puerto del orchestrator (ej: 8000)",
+    "{api_gateway_port}": "Puerto del API Gateway (ej: 8080)",
+    "{runner_image}": "Imagen del runner usada",
+    "{registry_url}": "URL del registry",
+    # GitHub API
+    "{repo_owner}": "Owner del repositorio (ej: eliaspizarro)",
+    "{repo_name}": "Nombre del repo sin owner (ej: hello-ci)",
+    "{repo_full_name}": "Nombre completo del repo (ej: eliaspizarro/hello-ci)",
+    "{user_login}": "Username del token",
+})
+
+# Patrón de placeholders en plantillas
+_PLACEHOLDER_RE = re.compile(r"\{[^}]+\}")
+
+# Hostname del contenedor: fijo durante la vida del proceso (evita un uname por resolución)
+_HOSTNAME = socket.gethostname()
+
+# Claves de contexto mínimas para resolver placeholders
+_REQUIRED_CONTEXT = ("scope_name", "runner_name", "registration_token")
+
+
 class PlaceholderResolver:
     """Resuelve placeholders en plantillas de configuración."""
     
+    __slots__ = ("logger", "orchestrator_id")
+    
+    AVAILABLE_KEYS = frozenset(_AVAILABLE_PLACEHOLDERS)
+    
     def __init__(self):
         self.logger = setup_logger(__name__)
         self.orchestrator_id = f"orchestrator-{os.getpid()}"
@@ -211,11 +385,14 @@ class PlaceholderResolver:
     def resolve_placeholders(self, template: str, context: Dict[str, Any]) -> str:
         """Resuelve todos los placeholders en una plantilla."""
         try:
+            # Camino rápido: plantilla sin placeholders
+            if "{" not in template:
+                return template
+            
             # Validar contexto minimo
-            required_context = ["scope_name", "runner_name", "registration_token"]
-            for key in required_context:
+            for key in _REQUIRED_CONTEXT:
                 if key not in context:
-                    self.logger.warning(f"Context missing required variable: {key}")
+                    self.logger.warning("Context missing required variable: %s", key)
                     context[key] = f"missing_{key}"
             
             # Construir diccionario de sustituciones
@@ -229,98 +406,61 @@ class PlaceholderResolver:
             return result
         
         except Exception as e:
-            self.logger.error(f"Error resolviendo placeholders: {e}")
+            self.logger.error("Error resolviendo placeholders: %s", e)
             return template
     
     def _build_substitutions(self, context: Dict[str, Any]) -> Dict[str, str]:
         """Construye diccionario completo de sustituciones."""
-        now = datetime.datetime.utcnow()
+        now = _utcnow()
         scope_name = context.get("scope_name", "")
         runner_name = context.get("runner_name", "")
         registration_token = context.get("registration_token", "")
         
+        # owner/repo en una sola pasada
+        repo_owner, sep, repo_name = scope_name.partition("/")
+        if not sep:
+            repo_owner, repo_name = "unknown", scope_name
+        
         # Variables basicas
         substitutions = {
             "{scope_name}": scope_name,
             "{runner_name}": runner_name,
             "{registration_token}": registration_token,
             # Variables de tiempo
-            "{timestamp}": str(int(time.time())),
-            "{timestamp_iso}": now.isoformat() + "Z",
+            "{timestamp}": str(int(now.timestamp())),
+            "{timestamp_iso}": now.isoformat().replace("+00:00", "Z"),
             "{timestamp_date}": now.strftime("%Y-%m-%d"),
             "{timestamp_time}": now.strftime("%H-%M-%S"),
             # Variables de sistema
-            "{hostname}": socket.gethostname(),
+            "{hostname}": _HOSTNAME,
             "{orchestrator_id}": self.orchestrator_id,
-            "{docker_network}": os.getenv("DOCKER_NETWORK", "bridge"),
+            "{docker_network}": get_env_var("DOCKER_NETWORK", "bridge"),
             # Variables de entorno
-            "{orchestrator_port}": os.getenv("ORCHESTRATOR_PORT", "8000"),
-            "{api_gateway_port}": os.getenv("API_GATEWAY_PORT", "8080"),
-            "{runner_image}": os.getenv("RUNNER_IMAGE", "unknown"),
-            "{registry_url}": os.getenv("REGISTRY", "unknown"),
+            "{orchestrator_port}": get_env_var("ORCHESTRATOR_PORT", "8000"),
+            "{api_gateway_port}": get_env_var("API_GATEWAY_PORT", "8080"),
+            "{runner_image}": get_env_var("RUNNER_IMAGE", "unknown"),
+            "{registry_url}": get_env_var("REGISTRY", "unknown"),
             # Variables de GitHub API
-            "{repo_owner}": self._extract_repo_owner(scope_name),
-            "{repo_name}": self._extract_repo_name(scope_name),
+            "{repo_owner}": repo_owner,
+            "{repo_name}": repo_name,
             "{repo_full_name}": scope_name,
-            "{user_login}": os.getenv("GITHUB_USER_LOGIN", "unknown"),
+            "{user_login}": get_env_var("GITHUB_USER_LOGIN", "unknown"),
         }
         
         return substitutions
     
-    def _extract_repo_owner(self, scope_name: str) -> str:
-        """Extrae el owner del scope_name."""
-        if "/" in scope_name:
-            return scope_name.split("/")[0]
-        return "unknown"
-    
-    def _extract_repo_name(self, scope_name: str) -> str:
-        """Extrae el nombre del repo del scope_name."""
-        if "/" in scope_name:
-            return scope_name.split("/")[1]
-        return scope_name
-    
     def get_available_placeholders(self) -> Dict[str, str]:
         """Retorna lista de placeholders disponibles con descripción."""
-        return {
-            # Básicas
-            "{scope_name}": "Nombre del repositorio/organización (ej: eliaspizarro/hello-ci)",
-            "{runner_name}": "Nombre único del runner (ej: ephemeral-runner-abc123)",
-            "{registration_token}": "Token efímero de registro",
-            # Tiempo
-            "{timestamp}": "Timestamp Unix actual",
-            "{timestamp_iso}": "Timestamp ISO 8601 (ej: 2024-02-03T18:30:34Z)",
-            "{timestamp_date}": "Fecha actual YYYY-MM-DD (ej: 2024-02-03)",
-            "{timestamp_time}": "Hora actual HH-MM-SS (ej: 18-30-34)",
-            # Sistema
-            "{hostname}": "Hostname del sistema (ej: docker2)",
-            "{orchestrator_id}": "ID único del orchestrator",
-            "{docker_network}": "Red Docker usada",
-            # Entorno
-            "{orchestrator_port}": "Puerto del orchestrator (ej: 8000)",
-            "{api_gateway_port}": "Puerto del API Gateway (ej: 8080)",
-            "{runner_image}": "Imagen del runner usada",
-            "{registry_url}": "URL del registry",
-            # GitHub API
-            "{repo_owner}": "Owner del repositorio (ej: eliaspizarro)",
-            "{repo_name}": "Nombre del repo sin owner (ej: hello-ci)",
-            "{repo_full_name}": "Nombre completo del repo (ej: eliaspizarro/hello-ci)",
-            "{user_login}": "Username del token",
-        }
+        return dict(_AVAILABLE_PLACEHOLDERS)
     
     def validate_template(self, template: str) -> Dict[str, Any]:
         """Valida una plantilla y retorna información sobre placeholders."""
         # Encontrar todos los placeholders
-        placeholders = re.findall(r"\{[^}]+\}", template)
-        available = self.get_available_placeholders()
-        
-        valid_placeholders = []
-        invalid_placeholders = []
+        placeholders = _PLACEHOLDER_RE.findall(template)
+        available = self.AVAILABLE_KEYS
         
-        for placeholder in placeholders:
-            if placeholder in available:
-                valid_placeholders.append(placeholder)
-            else:
-                invalid_placeholders.append(placeholder)
+        valid_placeholders = [p for p in placeholders if p in available]
+        invalid_placeholders = [p for p in placeholders if p not in available]
         
         return {
             "template": template,
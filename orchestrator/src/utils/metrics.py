@@ -0,0 +1,121 @@
+"""
+Registro de métricas en proceso para el Orchestrator.
+Contadores y gauges simples actualizados por el hilo de monitoreo y leídos sin locks por la API.
+"""
+
+import threading
+import time
+from typing import Dict, Tuple, Union
+
+Number = Union[int, float]
+
+
+class Counter:
+    """Contador monótono."""
+
+    __slots__ = ("name", "description", "_value", "_lock")
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        """Incrementa el contador."""
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Gauge:
+    """Valor instantáneo (la asignación de un atributo es atómica bajo el GIL)."""
+
+    __slots__ = ("name", "description", "_value")
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._value: Number = 0
+
+    def set(self, value: Number) -> None:
+        """Fija el valor del gauge."""
+        self._value = value
+
+    @property
+    def value(self) -> Number:
+        return self._value
+
+
+class MetricsRegistry:
+    """Registro de métricas del orchestrator."""
+
+    PROMETHEUS_PREFIX = "orchestrator_"
+    PROMETHEUS_CACHE_TTL = 1.0
+
+    def __init__(self):
+        self._metrics: Dict[str, Union[Counter, Gauge]] = {}
+        self._prometheus_cache: Tuple[float, bytes] = (0.0, b"")
+        self.monitor_cycles_total = self.counter(
+            "monitor_cycles_total", "Ciclos de monitoreo completados"
+        )
+        self.monitor_errors_total = self.counter(
+            "monitor_errors_total", "Ciclos de monitoreo fallidos"
+        )
+        self.runners_created_total = self.counter(
+            "runners_created_total", "Runners creados"
+        )
+        self.runners_destroyed_total = self.counter(
+            "runners_destroyed_total", "Runners destruidos"
+        )
+        self.github_count_requests_total = self.counter(
+            "github_count_requests_total", "Consultas de conteo de workflow runs enviadas a GitHub"
+        )
+        self.github_not_modified_total = self.counter(
+            "github_not_modified_total", "Consultas de conteo respondidas con 304 (sin costo de rate limit)"
+        )
+        self.monitor_active = self.gauge(
+            "monitor_active", "1 si el monitoreo automático está activo"
+        )
+        self.monitor_interval_seconds = self.gauge(
+            "monitor_interval_seconds", "Intervalo entre ciclos de monitoreo"
+        )
+        self.active_runners = self.gauge(
+            "active_runners", "Runners activos gestionados por el orchestrator"
+        )
+
+    def counter(self, name: str, description: str) -> Counter:
+        """Registra un contador."""
+        metric = self._metrics[name] = Counter(name, description)
+        return metric
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        """Registra un gauge."""
+        metric = self._metrics[name] = Gauge(name, description)
+        return metric
+
+    def snapshot(self) -> Dict[str, Number]:
+        """Retorna los valores actuales de todas las métricas."""
+        return {name: metric.value for name, metric in self._metrics.items()}
+
+    def render_prometheus(self) -> bytes:
+        """Serializa las métricas en formato de texto Prometheus (cacheado PROMETHEUS_CACHE_TTL)."""
+        now = time.monotonic()
+        expires_at, body = self._prometheus_cache
+        if now < expires_at:
+            return body
+
+        prefix = self.PROMETHEUS_PREFIX
+        body = "".join([
+            f"# HELP {prefix}{metric.name} {metric.description}\n"
+            f"# TYPE {prefix}{metric.name} {metric.kind}\n"
+            f"{prefix}{metric.name} {metric.value}\n"
+            for metric in self._metrics.values()
+        ]).encode()
+        self._prometheus_cache = (now + self.PROMETHEUS_CACHE_TTL, body)
+        return body